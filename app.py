@@ -1,22 +1,33 @@
 import streamlit as st
 import json
 import os
+import queue
 import schedule
+import threading
 import time
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from sync_Trakt_to_emby import (
     get_trakt_device_code,
-    poll_for_access_token,
+    poll_trakt_token_once,
+    TRAKT_POLL_FINAL_STATUSES,
     load_token,
     refresh_access_token,
     sync_trakt_list_to_emby,
     get_access_token,
     sync_all_trakt_lists,
+    group_lists_by_library,
     check_required_env_vars,
     get_config,
+    get_fortnightly_epoch,
+    is_fortnightly_week,
     get_missing_items,
+    missing_item_key,
+    extract_emby_id_from_url,
     recheck_missing_item,
+    recheck_missing_items_bulk,
     clear_missing_items_for_collection,
     load_missing_items,
     toggle_verbose_logging,
@@ -27,29 +38,287 @@ from sync_Trakt_to_emby import (
     unignore_item,
     load_ignored_items
 )
-import requests
+
+# Static lookup tables used while rendering
+_WEEKDAY_INDEX = {
+    'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
+    'Friday': 4, 'Saturday': 5, 'Sunday': 6
+}
+_DAYS_OF_WEEK = tuple(_WEEKDAY_INDEX)
+_ORDINAL_SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd'}
+_INTERVAL_OPTIONS = {
+    '6h': 'Every 6 Hours',
+    '1d': 'Daily',
+    '1w': 'Weekly',
+    '2w': 'Fortnightly',
+    '1m': 'Monthly',
+    '1min': 'Every Minute (TESTING)',
+}
+_INTERVAL_KEYS = tuple(_INTERVAL_OPTIONS)
+_INTERVAL_IDX = {key: i for i, key in enumerate(_INTERVAL_KEYS)}
+
+# Setup instructions shown on the Settings tabs
+_TRAKT_SETUP_DOCS = """
+### How to get Trakt API Credentials:
+1. Visit [Trakt API Settings](https://trakt.tv/oauth/applications)
+2. Click "New Application"
+3. Fill in the application details:
+   - Name: "Trakt2EmbySync" (or any name you prefer)
+   - Redirect URI: urn:ietf:wg:oauth:2.0:oob
+   - Javascript Origins: Leave blank
+4. Click "Save App"
+5. You'll see your Client ID and Client Secret
+"""
+
+_EMBY_SETUP_DOCS = """
+### How to get Emby Configuration:
+
+#### API Key:
+1. Open Emby Dashboard
+2. Click on your username in the top right
+3. Select "Profile"
+4. Go to "API Keys" (or "Api Keys" in some versions)
+5. Click "+" to create a new key
+6. Enter a name like "Trakt2EmbySync" and click "Ok"
+7. Copy the generated API key
+
+#### Server URL:
+- Your Emby server URL (e.g., http://localhost:8096 or your remote URL)
+- Include http:// or https:// and any port numbers
+- Don't include trailing slashes
+
+#### Admin User ID:
+1. Go to Emby Dashboard
+2. Click on "Users"
+3. Click on your admin user
+4. The ID is in the URL (e.g., .../web/dashboard/users/edit?userId=**THIS_IS_YOUR_ID**)
+
+#### Library IDs:
+You can specify different Emby libraries for each Trakt list in the Main page.
+To find your library IDs:
+1. Go to Emby Dashboard
+2. Click "Libraries"
+3. Click on your library (Movies, TV Shows, Movies 4K, etc.)
+4. The ID is in the URL (e.g., .../web/dashboard/library?parentId=**THIS_IS_YOUR_ID**)
+"""
 
 # Define helper functions that will be used across the app
+@st.cache_data(ttl=5)
+def _cached_missing_counts():
+    """Count missing items per collection, cached briefly since sync callbacks fire once per item"""
+    counts = Counter()
+    for item in get_missing_items():
+        names = [c.get('name', 'Unknown') for c in item.get('collections') or []]
+        counts.update(names or [item.get('collection_name', 'Unknown')])
+    return counts
+
+@st.cache_data(max_entries=4)
+def _group_missing_by_collection(missing_items):
+    """Group missing items as {collection: [(key, item), ...]}, recomputed only when the items change"""
+    collections = {}
+    seen = set()
+    for item in missing_items:
+        key = missing_item_key(item)
+        # Handle both old and new format
+        if 'collections' in item and item['collections']:
+            names = [collection_info.get('name', 'Unknown') for collection_info in item['collections']]
+        else:  # Fallback to old format
+            names = [item.get('collection_name', 'Unknown')]
+        for collection in names:
+            if collection not in collections:
+                collections[collection] = []
+            # Only add an item once per collection
+            if (collection, key) not in seen:
+                seen.add((collection, key))
+                collections[collection].append((key, item))
+    return collections
+
+@st.cache_data(max_entries=4)
+def _group_ignored_by_collection(ignored_items):
+    """Group ignored items as {collection: [(key, item, collections_str), ...]}, recomputed only when the items change"""
+    collections = {}
+    seen = set()
+    for item in ignored_items:
+        key = missing_item_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        # Get collection name - handle both old and new format
+        if 'collections' in item and item['collections']:
+            # New format - use first collection in the list
+            collection = item['collections'][0].get('name', 'Unknown')
+        else:
+            # Old format or fallback
+            collection = item.get('collection_name', 'Unknown')
+        
+        # Join the display string here rather than on every render; it is kept
+        # beside the item so it never ends up in ignored_items.json
+        collections_str = ', '.join(c.get('name', 'Unknown') for c in item.get('collections') or [])
+        collections.setdefault(collection, []).append((key, item, collections_str))
+    return collections
+
+@st.cache_data(max_entries=4)
+def _library_options_by_type(libs_key):
+    """Return {type: (options, ids)} for the configured libraries, in one pass over them"""
+    by_type = {list_type: ([], []) for list_type in ("movies", "shows")}
+    for lib_id, name, lib_type in libs_key:
+        options, ids = by_type.setdefault(lib_type, ([], []))
+        options.append(f"{name} ({lib_id})")
+        ids.append(lib_id)
+    return by_type
+
+def _missing_items_table(items):
+    """Render the read-only fields of (key, item) pairs as one markdown table"""
+    def cell(value):
+        return str(value).replace('|', '\\|').replace('\n', ' ')
+    
+    rows = [
+        "| Title | Type | Trakt IDs | Last checked | Reason | In collections |",
+        "|---|---|---|---|---|---|"
+    ]
+    for _, item in items:
+        ids = ', '.join(f"{id_type}: {id_value}" for id_type, id_value in item.get('ids', {}).items())
+        collections_list = ', '.join(c.get('name', 'Unknown') for c in item.get('collections', []))
+        rows.append('| ' + ' | '.join(cell(value) for value in (
+            f"{item.get('title', 'Unknown')} ({item.get('year', '')})",
+            item.get('type', 'movie').capitalize(),
+            ids,
+            item.get('last_checked', 'Never'),
+            item.get('reason', 'Unknown'),
+            collections_list or item.get('collection_name', '')
+        )) + ' |')
+    return '\n'.join(rows)
+
+# Minimum delay between two progress redraws for the same collection
+SYNC_STATUS_MIN_INTERVAL = 0.25
+
+# Minimum delay between two redraws of the per-collection progress bars (~20 Hz)
+SYNC_PROGRESS_MIN_INTERVAL = 0.05
+
+# Most recent per-item errors kept on screen under each collection's status
+SYNC_STATUS_MAX_ERRORS = 5
+
+# Per-collection placeholder, last emitted (timestamp, progress) and errors, reset on every script run
+_sync_status_placeholders = {}
+_sync_status_emitted = {}
+_sync_status_errors = {}
+
+def is_sync_error(message):
+    """Whether a sync status message reports an error; those are never throttled or coalesced"""
+    return message.lstrip().startswith(('Error', 'Cannot', 'Failed'))
+
 def process_sync_status(progress, collection_name, processed, total, message):
     """Display sync status in the main page"""
-    if progress >= 1.0:  # When sync is completed
-        st.success(f"✅ Sync completed for {collection_name}")
-        st.write(message)
+    # Throttle redraws except for errors and completion
+    now = time.monotonic()
+    last_emit, last_progress = _sync_status_emitted.get(collection_name, (0.0, 0.0))
+    if is_sync_error(message) and progress < 1.0:  # A final error is the completion message itself
+        _sync_status_errors.setdefault(collection_name, []).append(message.strip())
+    elif progress < 1.0 and now - last_emit < SYNC_STATUS_MIN_INTERVAL:
+        return
+    # The bar never moves backwards, but the message is still redrawn
+    progress = max(progress, last_progress)
+    _sync_status_emitted[collection_name] = (now, progress)
+    
+    # Redraw this collection's status in place instead of appending new elements
+    if collection_name not in _sync_status_placeholders:
+        _sync_status_placeholders[collection_name] = st.empty()
+    
+    with _sync_status_placeholders[collection_name].container():
+        if progress >= 1.0:  # When sync is completed
+            st.success(f"✅ Sync completed for {collection_name}")
+            st.write(message)
+            
+            # Get count of missing items for this collection. Another list may have filled the cache
+            # before this one added its missing items; this only runs as a list finishes, so recount
+            _cached_missing_counts.clear()
+            missing_count = _cached_missing_counts()[collection_name]
+            
+            # If there are missing items, inform the user
+            if missing_count > 0:
+                st.warning(f"⚠️ {missing_count} items could not be found in your Emby library. Check the **Missing Items** tab for details.")
+        else:
+            # Show progress bar
+            st.progress(progress)
+            st.info(f"Processing {collection_name}: {processed}/{total} items")
+            st.text(message)
+        for error in _sync_status_errors.get(collection_name, [])[-SYNC_STATUS_MAX_ERRORS:]:
+            st.error(error)
+
+def show_sync_progress(container, bars):
+    """Show one progress bar per collection, updating existing bars in place"""
+    # Highest progress shown per collection, so late callbacks never move a bar backwards
+    prog_max = st.session_state.setdefault('_prog_max', {})
+    for collection_name, progress_data in st.session_state.sync_progress.items():
+        if collection_name:  # Only show progress for actual collections
+            shown = prog_max.get(collection_name, 0.0)
+            progress = max(progress_data['progress'], shown)
+            prog_max[collection_name] = progress
+            text = f"**{collection_name}**: processed {progress_data['processed']} of {progress_data['total']} items"
+            if collection_name not in bars:
+                bars[collection_name] = container.progress(progress, text=text)
+            elif progress > shown:
+                bars[collection_name].progress(progress, text=text)
+
+# Number of libraries whose Trakt lists are synced at the same time
+SYNC_MAX_PARALLEL_LISTS = 4
+
+def sync_lists_concurrently(trakt_lists, access_token, on_list_done=None):
+    """Sync Trakt lists in parallel, replaying their progress on the script thread; False if a sync is already running"""
+    if not trakt_lists:
+        return True
+    
+    # A double click or a fast rerun must not start a second, overlapping sync
+    sync_lock = st.session_state.setdefault('sync_lock', threading.Lock())
+    if not sync_lock.acquire(blocking=False):
+        return False
+    try:
+        # Streamlit elements can only be written from the script thread, so workers queue their updates
+        updates = queue.Queue()
         
-        # Get count of missing items for this collection
-        missing_count = 0
-        for item in get_missing_items():
-            if item.get('collection_name') == collection_name:
-                missing_count += 1
+        def drain_updates():
+            # Coalesce everything queued since the last tick into the newest update per collection;
+            # errors are shown as they come instead of being coalesced away
+            latest = {}
+            while True:
+                try:
+                    args = updates.get_nowait()
+                except queue.Empty:
+                    break
+                if is_sync_error(args[4]):
+                    process_sync_status(*args)
+                else:
+                    latest[args[1]] = args
+            for args in latest.values():
+                process_sync_status(*args)
         
-        # If there are missing items, inform the user
-        if missing_count > 0:
-            st.warning(f"⚠️ {missing_count} items could not be found in your Emby library. Check the **Missing Items** tab for details.")
-    else:
-        # Show progress bar
-        st.progress(progress)
-        st.info(f"Processing {collection_name}: {processed}/{total} items")
-        st.text(message)
+        # Lists that sync into the same library run one after another in a single worker, so a cold
+        # library is fetched once and then reused from the run's library cache; different libraries
+        # sync in parallel
+        library_cache = {}
+        list_done = queue.Queue()
+        
+        def sync_group(group):
+            for trakt_list in group:
+                sync_trakt_list_to_emby(trakt_list, access_token, lambda *args: updates.put(args),
+                                        library_cache=library_cache)
+                list_done.put(True)
+        
+        groups = group_lists_by_library(trakt_lists)
+        with ThreadPoolExecutor(max_workers=min(SYNC_MAX_PARALLEL_LISTS, len(groups))) as executor:
+            pending = {executor.submit(sync_group, group) for group in groups}
+            while pending:
+                done, pending = wait(pending, timeout=SYNC_STATUS_MIN_INTERVAL, return_when=FIRST_COMPLETED)
+                drain_updates()
+                while not list_done.empty():
+                    list_done.get_nowait()
+                    if on_list_done:
+                        on_list_done()
+                for future in done:
+                    future.result()  # Re-raise errors from the worker
+    finally:
+        sync_lock.release()
+    return True
 
 def perform_sync_all():
     """Start syncing all Trakt lists to Emby"""
@@ -81,24 +350,22 @@ def perform_sync_all():
             # Get access token first
             access_token = get_access_token()
             if access_token:
-                for trakt_list in st.session_state.trakt_lists:
-                    sync_trakt_list_to_emby(trakt_list, access_token, process_sync_status)
-                    
+                def show_status():
                     # Show current status and progress
                     status_placeholder.text(st.session_state.current_message)
                     progress_bar.progress(st.session_state.current_progress)
                 
+                if not sync_lists_concurrently(st.session_state.trakt_lists, access_token, show_status):
+                    status_placeholder.warning("Sync already running")
+                    return
+                
                 # Mark sync as complete
                 progress_bar.progress(1.0)
                 status_placeholder.success("Sync completed!")
+                _cached_missing_counts.clear()
                 
                 # Check for missing items
-                missing_counts = {}
-                for item in get_missing_items():
-                    collection = item.get('collection_name', 'Unknown')
-                    if collection not in missing_counts:
-                        missing_counts[collection] = 0
-                    missing_counts[collection] += 1
+                missing_counts = _cached_missing_counts()
                 
                 if missing_counts:
                     warning_text = "⚠️ Some items could not be found in your Emby library:\n"
@@ -114,26 +381,204 @@ def perform_sync_all():
     # Mark sync as completed
     st.session_state.sync_running = False
 
+def queue_toast(message, seconds=2):
+    """Show a message as a toast after the next rerun instead of sleeping before it"""
+    st.session_state._toast = (message, time.monotonic() + seconds)
+
+def show_queued_toast():
+    """Show the queued toast once, dropping it if it expired before a rerun happened"""
+    toast = st.session_state.pop('_toast', None)
+    if toast and time.monotonic() < toast[1]:
+        st.toast(toast[0])
+
+# Trakt device codes expire after 10 minutes; the panel checks for a result this often (seconds)
+TRAKT_DEVICE_CODE_TTL = 600
+AUTH_POLL_UI_INTERVAL = 1
+
+def _poll_worker(device_code, interval, result_queue, stop_event):
+    """Poll Trakt off the script thread until the user authorizes or the code is dead, then queue (token, status)"""
+    deadline = time.monotonic() + TRAKT_DEVICE_CODE_TTL
+    # Half a second of slack so a poll never lands just inside Trakt's rate window
+    while not stop_event.wait(interval + 0.5):
+        access_token, status = poll_trakt_token_once(device_code)
+        # A denied, expired, used or invalid code will never succeed, so stop at once
+        if access_token or status in TRAKT_POLL_FINAL_STATUSES or time.monotonic() >= deadline:
+            result_queue.put((access_token, status))
+            return
+
+def _start_auth_polling():
+    """Start polling Trakt in the background once the user has entered the device code"""
+    if st.session_state.get('_auth_poll'):
+        return
+    result_queue = queue.Queue()
+    stop_event = threading.Event()
+    threading.Thread(
+        target=_poll_worker,
+        args=(st.session_state.trakt_device_code, st.session_state.trakt_poll_interval or 5, result_queue, stop_event),
+        daemon=True
+    ).start()
+    st.session_state._auth_poll = (result_queue, stop_event)
+    st.session_state.auth_polling_started = True
+
+def _cancel_trakt_auth():
+    """Abandon the pending Trakt device authentication"""
+    auth_poll = st.session_state.pop('_auth_poll', None)
+    if auth_poll:
+        auth_poll[1].set()  # Stop the background poller
+    st.session_state.trakt_auth_in_progress = False
+    st.session_state.trakt_device_code = None
+    st.session_state.trakt_user_code = None
+    st.session_state.trakt_poll_interval = None
+    st.session_state.auth_polling_started = False
+
+# Toasts for device token poll replies that end the authentication
+_AUTH_FAILURE_MESSAGES = {
+    404: "🚫 The Trakt code was not recognised. Please try again.",
+    409: "🚫 The Trakt code was already used. Please try again.",
+    410: "🚫 The Trakt code expired. Please try again.",
+    418: "🚫 Authorization was denied on Trakt."
+}
+
+@st.fragment(run_every=AUTH_POLL_UI_INTERVAL)
+def _auth_poll_status():
+    """Check the background poller for a result, rerunning only this fragment until there is one"""
+    try:
+        access_token, status = st.session_state._auth_poll[0].get_nowait()
+    except (queue.Empty, AttributeError):
+        # No answer yet (or polling was cancelled); the fragment looks again on its next run
+        st.markdown("⏳ Verifying authorization...")
+        return
+    st.session_state.pop('_auth_poll', None)
+    st.session_state.auth_polling_started = False
+    
+    if access_token:
+        # Authentication successful - reset auth state and continue with sync
+        st.session_state.trakt_auth_in_progress = False
+        st.session_state.trakt_device_code = None
+        st.session_state.trakt_user_code = None
+        st.session_state.trakt_poll_interval = None
+        st.session_state.auth_complete = True
+        _cached_token_status.clear()
+        
+        # Start the sync process
+        st.session_state.sync_in_progress = True
+        st.session_state.sync_progress = {}
+        st.session_state.current_message = "Authentication successful! Starting sync..."
+        queue_toast("👍 Successfully connected to Trakt!")
+    else:
+        # Authentication failed or timed out
+        st.session_state.trakt_auth_in_progress = False
+        queue_toast(_AUTH_FAILURE_MESSAGES.get(status, "🚫 Authentication failed or timed out. Please try again."))
+    # The panel around this fragment has to redraw (and start the sync), so rerun the app once
+    st.rerun()
+
+@st.fragment
+def _sync_status_panel():
+    """Sync progress and Trakt authentication, rerun on its own without the list editor below"""
+    show_queued_toast()
+    
+    # Create placeholders for status and progress
+    status_placeholder = st.empty()
+    progress_placeholder = st.empty()
+
+    # Handle sync if in progress
+    if st.session_state.sync_in_progress:
+        try:
+            access_token = get_access_token()
+            if access_token:
+                # Bars are created once per collection and then updated, not redrawn
+                progress_container = progress_placeholder.container()
+                progress_bars = {}
+                st.session_state._prog_max = {}
+                
+                def show_status():
+                    # Show current status and progress
+                    status_placeholder.text(st.session_state.current_message)
+                    
+                    # Skip bar updates that arrive faster than the frontend can show them
+                    now = time.monotonic()
+                    if now - st.session_state.get('_last_prog_ts', 0) > SYNC_PROGRESS_MIN_INTERVAL:
+                        show_sync_progress(progress_container, progress_bars)
+                        st.session_state._last_prog_ts = now
+                
+                if not sync_lists_concurrently(st.session_state.trakt_lists, access_token, show_status):
+                    st.warning("Sync already running")
+                    return
+            
+                st.session_state.last_sync = datetime.now()
+                st.session_state.sync_in_progress = False
+                _cached_missing_counts.clear()
+                queue_toast("👍 Sync completed successfully!")
+                st.rerun()  # Full rerun so the last sync time above is refreshed
+            else:
+                st.error("Failed to sync with Trakt")
+                st.session_state.sync_in_progress = False
+        except Exception as e:
+            st.error(f"An error occurred during sync: {str(e)}")
+            st.session_state.sync_in_progress = False
+            st.session_state.sync_progress = {}
+            st.session_state.current_message = ""
+
+    # Show current status and progress if active
+    if st.session_state.current_message:
+        status_placeholder.text(st.session_state.current_message)
+
+    if st.session_state.sync_progress:
+        show_sync_progress(progress_placeholder.container(), {})
+
+    # If authentication is in progress, create a container to show status
+    if st.session_state.trakt_auth_in_progress and st.session_state.trakt_device_code:
+        auth_container = st.container()
+        
+        with auth_container:
+            st.info("Please authenticate with Trakt:")
+            st.markdown("### [Click here to authorize](https://trakt.tv/activate)")
+            
+            # Make the code more prominent
+            st.markdown("### Your Authorization Code:")
+            st.code(st.session_state.trakt_user_code, language=None)
+            
+            # Add explicit instructions
+            st.markdown("""
+            1. Click the link above to open Trakt's activation page
+            2. Enter the code shown above
+            3. Authorize this application
+            4. Return here and click 'Continue' when done
+            """)
+            
+            # Add a button to confirm the user has completed authorization
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                # Callbacks update state before the panel reruns, so no extra rerun is needed
+                st.button("Continue", key="start_polling", on_click=_start_auth_polling)
+            with col2:
+                st.button("Cancel", key="cancel_auth", on_click=_cancel_trakt_auth)
+
+            # Only check for a token after the user clicks 'Continue'
+            if st.session_state.auth_polling_started and st.session_state.get('_auth_poll'):
+                _auth_poll_status()
+
 # Add helper functions for date handling
 def get_next_occurrence_date(day_of_week):
     """Calculate the next occurrence of a specific day of the week."""
-    days = {
-        'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
-        'Friday': 4, 'Saturday': 5, 'Sunday': 6
-    }
     today = datetime.now()
-    target_day_index = days.get(day_of_week, 0)  # Default to Monday if invalid
+    target_day_index = _WEEKDAY_INDEX.get(day_of_week, 0)  # Default to Monday if invalid
     days_until = (target_day_index - today.weekday()) % 7
     if days_until == 0:  # If it's the same day, move to next week
         days_until = 7
     return today + timedelta(days=days_until)
 
+@st.cache_data(max_entries=14)
+def _cached_next_occurrence(day_of_week, today_iso):
+    """get_next_occurrence_date cached per day; today_iso only keys the cache so it rolls over at midnight"""
+    return get_next_occurrence_date(day_of_week)
+
 def get_ordinal_suffix(n):
     """Return ordinal suffix for a number (1st, 2nd, 3rd, etc.)"""
     if 11 <= (n % 100) <= 13:
         return 'th'
     else:
-        return {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+        return _ORDINAL_SUFFIXES.get(n % 10, 'th')
 
 def add_new_list(name, list_id, list_type, library_id):
     """Add a new Trakt list to the session state and save to .env file"""
@@ -158,42 +603,68 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# In-memory copy of the .env file, loaded on first save and written back in one pass
+ENV_FILE = '.env'
+_env_cache = None
+
+def _read_env_lines():
+    """Return the non-blank, stripped lines of the .env file using a single read"""
+    if not os.path.exists(ENV_FILE):
+        return []
+    with open(ENV_FILE, 'r') as f:
+        lines = f.read().splitlines()
+    return [line.strip() for line in lines if line and not line.isspace()]
+
+def _load_env_cache():
+    """Parse the .env file once into an ordered key/value mapping (comments are kept as-is)"""
+    global _env_cache
+    if _env_cache is None:
+        _env_cache = OrderedDict()
+        for line in _read_env_lines():
+            key, sep, value = line.partition('=')
+            if line.startswith('#') or not sep:
+                _env_cache[line] = None
+            else:
+                _env_cache[key.strip()] = value
+    return _env_cache
+
+def _flush_env():
+    """Write the cached .env contents back to disk"""
+    env_lines = [f'{key}\n' if value is None else f'{key}={value}\n' for key, value in _load_env_cache().items()]
+    with open(ENV_FILE, 'w') as f:
+        f.writelines(env_lines)
+
+def save_env_values(values):
+    """Update one or more .env keys, write the file once and mirror the values into os.environ"""
+    env = _load_env_cache()
+    # Keys are looked up in the parsed mapping, so only rewrite the file when a value actually changed
+    changed = {key: value for key, value in values.items() if env.get(key) != value}
+    if changed:
+        env.update(changed)
+        _flush_env()
+        _compute_missing.clear()
+        _cached_get_config.clear()
+        _cached_emby_status.clear()
+    os.environ.update(values)
+
 # Main app title
 def save_config():
     """Save configuration to .env file"""
-    env_content = []
     try:
-        # Read existing .env file
-        if os.path.exists('.env'):
-            with open('.env', 'r') as f:
-                env_content = [line.strip() for line in f if line.strip()]
+        _load_env_cache()
     except Exception as e:
         st.error(f"Error reading .env file: {str(e)}")
         return False
 
     # Update or add new values
+    values = {}
     for key, value in st.session_state.config.items():
-        key_prefix = f"{key}="
-        if key == 'TRAKT_LISTS':
-            new_line = f'{key}={json.dumps(value)}'
-        else:
-            new_line = f'{key}={value}'
-        
-        # Find and replace existing line or append new one
-        found = False
-        for i, line in enumerate(env_content):
-            if line.startswith(key_prefix):
-                env_content[i] = new_line
-                found = True
-                break
-        if not found:
-            env_content.append(new_line)
+        if key == 'TRAKT_LISTS' and not isinstance(value, str):
+            value = json.dumps(value)
+        values[key] = str(value)
     
     try:
-        with open('.env', 'w') as f:
-            f.write('\n'.join(env_content) + '\n')
-        # Force reload of environment variables
-        load_dotenv(override=True)
+        save_env_values(values)
         return True
     except Exception as e:
         st.error(f"Error saving configuration: {str(e)}")
@@ -206,6 +677,16 @@ def set_config(key, value):
     st.session_state.config[key] = value
     save_config()
 
+def save_config_form(values):
+    """Apply the fields of a settings form that changed and save them in one pass"""
+    changed = {key: value for key, value in values.items() if value != _cached_get_config(key)}
+    if changed:
+        if 'config' not in st.session_state:
+            st.session_state.config = {}
+        st.session_state.config.update(changed)
+        save_config()
+    return changed
+
 def create_default_env():
     """Create default .env file if it doesn't exist"""
     if not os.path.exists('.env'):
@@ -228,20 +709,27 @@ TRAKT_LISTS=[]
         return True
     return False
 
+REQUIRED_CONFIG_VARS = (
+    'TRAKT_CLIENT_ID',
+    'TRAKT_CLIENT_SECRET',
+    'EMBY_API_KEY',
+    'EMBY_SERVER',
+    'EMBY_ADMIN_USER_ID'
+)
+
+@st.cache_data(ttl=60)
+def _cached_get_config(key):
+    """Read a configuration value once per minute instead of re-parsing .env on every widget (cleared on save)"""
+    return get_config(key)
+
+@st.cache_data(ttl=30)
+def _compute_missing(required_vars):
+    """Return the required configuration keys that have no value (cached, cleared on save)"""
+    return [var for var in required_vars if not get_config(var)]
+
 def check_required_config():
     """Check if all required configuration is present"""
-    required_vars = [
-        'TRAKT_CLIENT_ID',
-        'TRAKT_CLIENT_SECRET',
-        'EMBY_API_KEY',
-        'EMBY_SERVER',
-        'EMBY_ADMIN_USER_ID'
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        if not get_config(var):
-            missing_vars.append(var)
+    missing_vars = _compute_missing(REQUIRED_CONFIG_VARS)
     
     if missing_vars:
         return {'Missing Configuration': missing_vars}
@@ -250,37 +738,30 @@ def check_required_config():
 # Create default .env if it doesn't exist
 is_new_install = create_default_env()
 
-# Load environment variables
-load_dotenv()
-
-# Initialize session state
+# Initialize session state; .env is parsed once per session since saves update os.environ directly
 if 'config' not in st.session_state:
+    load_dotenv()
     st.session_state.config = {}
 
 # Load configuration into session state
-for key in os.environ:
-    st.session_state.config[key] = os.environ[key]
+st.session_state.config.update(os.environ)
 
-# Initialize Trakt lists
-if 'trakt_lists' not in st.session_state:
+def load_json_setting(key, state_key):
+    """Parse a JSON list setting into session state, skipping json.loads when the raw value is unchanged"""
+    raw = st.session_state.config.get(key) or '[]'
+    raw_key = f'_{state_key}_raw'
+    if state_key in st.session_state and st.session_state.get(raw_key) == raw:
+        return
     try:
-        trakt_lists_json = get_config('TRAKT_LISTS')
-        if trakt_lists_json:
-            st.session_state.trakt_lists = json.loads(trakt_lists_json)
-        else:
-            st.session_state.trakt_lists = []
+        st.session_state[state_key] = json.loads(raw)
     except json.JSONDecodeError:
-        st.session_state.trakt_lists = []
-        print("Error parsing TRAKT_LISTS JSON")
+        st.session_state[state_key] = []
+        print(f"Error parsing {key} JSON")
+    st.session_state[raw_key] = raw
 
-# Initialize Emby libraries
-if 'emby_libraries' not in st.session_state:
-    try:
-        libraries_json = get_config('EMBY_LIBRARIES') or '[]'
-        st.session_state.emby_libraries = json.loads(libraries_json)
-    except json.JSONDecodeError:
-        st.session_state.emby_libraries = []
-        print("Error parsing EMBY_LIBRARIES JSON")
+# Initialize Trakt lists and Emby libraries
+load_json_setting('TRAKT_LISTS', 'trakt_lists')
+load_json_setting('EMBY_LIBRARIES', 'emby_libraries')
 
 # Initialize trakt authentication state
 if 'trakt_auth_in_progress' not in st.session_state:
@@ -341,6 +822,11 @@ def check_scheduler():
     current_time = datetime.now()
     st.session_state.last_check_time = current_time
     
+    # Nothing can be due yet if the next run is still more than a second away
+    next_run = st.session_state.next_scheduled_run
+    if next_run and (next_run - current_time).total_seconds() > 1:
+        return
+    
     # Check pending jobs
     schedule.run_pending()
     
@@ -362,8 +848,8 @@ def start_streamlit_scheduler():
     schedule.clear()
     
     # Get sync interval and time
-    interval = get_config('SYNC_INTERVAL') or '6h'
-    sync_time = get_config('SYNC_TIME') or '00:00'
+    interval = _cached_get_config('SYNC_INTERVAL') or '6h'
+    sync_time = _cached_get_config('SYNC_TIME') or '00:00'
     
     # Set up schedule based on interval
     if interval == '6h':
@@ -376,8 +862,21 @@ def start_streamlit_scheduler():
         schedule.every().monday.at(sync_time).do(run_scheduled_sync)
         st.success(f"🕒 Scheduler set to run weekly on Mondays at {sync_time}")
     elif interval == '2w':
-        schedule.every(14).days.at(sync_time).do(run_scheduled_sync)
-        st.success(f"🕒 Scheduler set to run every 2 weeks at {sync_time}")
+        # Same rule as the console scheduler: the weekly slot on the sync day runs every other week,
+        # counted from the shared fortnightly epoch
+        sync_day = _cached_get_config('SYNC_DAY') or 'Monday'
+        epoch = get_fortnightly_epoch(sync_day, sync_time, create=True)
+        
+        def fortnightly_sync():
+            if is_fortnightly_week(datetime.now().date(), epoch):
+                return run_scheduled_sync()
+            return False
+        
+        if sync_day not in _WEEKDAY_INDEX:
+            sync_day = 'Monday'
+        day_job = getattr(schedule.every(), sync_day.lower())
+        day_job.at(sync_time).do(fortnightly_sync)
+        st.success(f"🕒 Scheduler set to run every 2 weeks on {sync_day} at {sync_time}")
     elif interval == '1m':
         schedule.every(30).days.at(sync_time).do(run_scheduled_sync)
         st.success(f"🕒 Scheduler set to run monthly at {sync_time}")
@@ -406,117 +905,100 @@ def stop_streamlit_scheduler():
 
 def save_settings():
     """Save settings to .env file"""
-    # First read existing lines that we don't manage
-    env_lines = []
-    managed_keys = {
-        'SYNC_INTERVAL', 'TRAKT_LISTS',
-        'TRAKT_CLIENT_ID', 'TRAKT_CLIENT_SECRET',
-        'EMBY_API_KEY', 'EMBY_SERVER',
-        'EMBY_ADMIN_USER_ID', 'EMBY_MOVIES_LIBRARY_ID',
-        'EMBY_TV_LIBRARY_ID'
-    }
+    values = {}
     
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if not any(line.startswith(f"{key}=") for key in managed_keys):
-                    env_lines.append(line.strip())
-    except FileNotFoundError:
-        pass
-
     # Add sync interval if it exists in session state
     if 'sync_interval' in st.session_state:
-        env_lines.append(f'SYNC_INTERVAL={st.session_state.sync_interval}')
+        values['SYNC_INTERVAL'] = str(st.session_state.sync_interval)
     
     # Add Trakt lists if they exist
     if hasattr(st.session_state, 'trakt_lists'):
-        trakt_lists_json = json.dumps(st.session_state.trakt_lists)
-        env_lines.append(f'TRAKT_LISTS={trakt_lists_json}')
-    
-    with open('.env', 'w') as f:
-        f.write('\n'.join(env_lines))
+        values['TRAKT_LISTS'] = json.dumps(st.session_state.trakt_lists)
     
-    # Force reload of environment variables
-    load_dotenv(override=True)
+    save_env_values(values)
 
 def save_config_value(key, value):
     """Save a single configuration value to .env file"""
     if not value:  # Don't save empty values
         return
-        
-    env_lines = []
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if not line.startswith(f"{key}="):
-                    env_lines.append(line.strip())
-    except FileNotFoundError:
-        pass
-    
-    env_lines.append(f'{key}={value}')
-    
-    with open('.env', 'w') as f:
-        f.write('\n'.join(env_lines))
+    if os.environ.get(key) == str(value):  # Nothing changed
+        return
     
-    # Force reload of environment variables
-    load_dotenv(override=True)
+    save_env_values({key: str(value)})
 
 def save_trakt_lists():
     """Save Trakt lists to .env file"""
-    env_lines = []
-    with open('.env', 'r') as f:
-        for line in f:
-            if not line.startswith('TRAKT_LISTS='):
-                env_lines.append(line.strip())
-    
     trakt_lists_json = json.dumps(st.session_state.trakt_lists)
-    env_lines.append(f'TRAKT_LISTS={trakt_lists_json}')
-    
-    with open('.env', 'w') as f:
-        f.write('\n'.join(env_lines))
-    
-    # Force reload of environment variables
-    load_dotenv(override=True)
+    if st.session_state.config.get('TRAKT_LISTS') == trakt_lists_json:  # Nothing changed
+        return
+    save_env_values({'TRAKT_LISTS': trakt_lists_json})
     
     # Update session state config to match
     st.session_state.config['TRAKT_LISTS'] = trakt_lists_json
+    st.session_state._trakt_lists_raw = trakt_lists_json
 
 def save_emby_libraries():
     """Save Emby libraries to .env file"""
-    env_lines = []
-    with open('.env', 'r') as f:
-        for line in f:
-            if not line.startswith('EMBY_LIBRARIES='):
-                env_lines.append(line.strip())
-    
     emby_libraries_json = json.dumps(st.session_state.emby_libraries)
-    env_lines.append(f'EMBY_LIBRARIES={emby_libraries_json}')
-    
-    with open('.env', 'w') as f:
-        f.write('\n'.join(env_lines))
-    
-    # Force reload of environment variables
-    load_dotenv(override=True)
+    if st.session_state.config.get('EMBY_LIBRARIES') == emby_libraries_json:  # Nothing changed
+        return
+    save_env_values({'EMBY_LIBRARIES': emby_libraries_json})
     
     # Update session state config to match
     st.session_state.config['EMBY_LIBRARIES'] = emby_libraries_json
+    st.session_state._emby_libraries_raw = emby_libraries_json
 
-def delete_library(index):
-    """Delete a library from the session state and save to .env file"""
-    st.session_state.emby_libraries.pop(index)
+# Widget key prefixes of the library editor rows (keyed by row position)
+LIBRARY_ROW_KEY_PREFIXES = ('lib_name_', 'lib_id_', 'lib_type_', 'lib_remove_')
+
+def apply_library_edits(staged):
+    """Replace the Emby libraries with the edited rows, dropping removed ones, and save once"""
+    updated = [library for remove, library in staged if not remove]
+    if updated == st.session_state.emby_libraries:
+        return False
+    st.session_state.emby_libraries = updated
     save_emby_libraries()
+    
+    # Rows may have shifted, so forget the positional widget state
+    for key in [key for key in st.session_state if key.startswith(LIBRARY_ROW_KEY_PREFIXES)]:
+        del st.session_state[key]
+    return True
 
-def delete_trakt_list(index):
-    """Delete a Trakt list from the session state and save to .env file"""
-    # Get the collection name before deleting
-    collection_name = st.session_state.trakt_lists[index]['collection_name']
+TRAKT_LISTS_EDITOR_KEY = 'lists_editor'
+
+def apply_trakt_list_edits(rows, label_to_id, options_by_type):
+    """Replace the Trakt lists with the edited table rows and save once"""
+    updated = []
+    for row in rows:
+        if not row.get('collection_name') or not row.get('list_id'):
+            continue  # Skip rows that were added but never filled in
+        list_type = row.get('type') or "movies"
+        library_id = label_to_id.get(row.get('library'), '')
+        type_ids = options_by_type[list_type][1]
+        if library_id not in type_ids:
+            # Same default as the old per-row selector: the first library of the list's type
+            library_id = type_ids[0] if type_ids else ''
+        updated.append({
+            'list_id': row['list_id'],
+            'collection_name': row['collection_name'],
+            'type': list_type,
+            'library_id': library_id
+        })
     
-    # Delete from session state
-    st.session_state.trakt_lists.pop(index)
+    if updated == st.session_state.trakt_lists:
+        return False
+    removed = ({l['collection_name'] for l in st.session_state.trakt_lists}
+               - {l['collection_name'] for l in updated})
+    st.session_state.trakt_lists = updated
     save_trakt_lists()
     
-    # Also clear any missing items for this collection
-    clear_missing_items_for_collection(collection_name)
+    # Also clear any missing items for deleted collections
+    for collection_name in removed:
+        clear_missing_items_for_collection(collection_name)
+    
+    # The table was rebuilt from the saved rows, so drop its staged edits
+    st.session_state.pop(TRAKT_LISTS_EDITOR_KEY, None)
+    return True
 
 def check_token_status():
     """Check if we have a valid Trakt token"""
@@ -534,8 +1016,22 @@ def check_token_status():
     # If we get here, we need to re-authenticate
     return False, "Token needs refresh"
 
+# Minimum delay between two progress commits for the same collection
+PROGRESS_COMMIT_INTERVAL = 0.1
+
+# Last committed (processed, timestamp) per collection, reset on every script run
+_progress_committed = {}
+
 def update_progress(progress, collection_name, processed, total, message=None):
     """Update the progress and current message in session state"""
+    # Commit at most ~200 steps per collection (or one per PROGRESS_COMMIT_INTERVAL); completion always lands
+    now = time.monotonic()
+    last_processed, last_commit = _progress_committed.get(collection_name, (0, 0.0))
+    if (processed < total and processed - last_processed < max(1, total // 200)
+            and now - last_commit <= PROGRESS_COMMIT_INTERVAL):
+        return
+    _progress_committed[collection_name] = (processed, now)
+    
     st.session_state.sync_progress[collection_name] = {
         'progress': progress,
         'processed': processed,
@@ -549,16 +1045,41 @@ def run_scheduled_sync():
     sync_all_trakt_lists(update_progress)
     st.session_state.last_sync = datetime.now()
 
+# Keep-alive session shared by the Trakt/Emby connection probes
+HTTP_TIMEOUT = 5
+
+@st.cache_resource
+def _http_session():
+    """Return a pooled requests session that survives reruns, so probes reuse open connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Keys checked by the "Test configuration" probes
+_TRAKT_REQUIRED_KEYS = ('TRAKT_CLIENT_ID', 'TRAKT_CLIENT_SECRET')
+_EMBY_REQUIRED_KEYS = (
+    'EMBY_API_KEY',
+    'EMBY_SERVER',
+    'EMBY_ADMIN_USER_ID',
+    'EMBY_MOVIES_LIBRARY_ID',
+    'EMBY_TV_LIBRARY_ID'
+)
+
 def check_configuration():
     """Test both Trakt and Emby configurations"""
+    http = _http_session()
+    
     results = {
         'trakt': {'status': False, 'message': ''},
         'emby': {'status': False, 'message': ''}
     }
     
-    # Check Trakt configuration
-    trakt_client_id = get_config('TRAKT_CLIENT_ID')
-    trakt_client_secret = get_config('TRAKT_CLIENT_SECRET')
+    # Check Trakt configuration (os.environ is kept in sync with .env by save_env_values)
+    trakt_client_id, trakt_client_secret = (os.environ.get(key, '') for key in _TRAKT_REQUIRED_KEYS)
     
     if not trakt_client_id or not trakt_client_secret:
         results['trakt']['message'] = "❌ Missing Trakt credentials"
@@ -570,7 +1091,7 @@ def check_configuration():
                 'trakt-api-version': '2',
                 'trakt-api-key': trakt_client_id
             }
-            response = requests.get('https://api.trakt.tv/users/settings', headers=headers)
+            response = http.get('https://api.trakt.tv/users/settings', headers=headers, timeout=HTTP_TIMEOUT)
             if response.status_code == 401:  # Expected without OAuth
                 results['trakt']['status'] = True
                 results['trakt']['message'] = "✅ Trakt API credentials are valid"
@@ -580,13 +1101,7 @@ def check_configuration():
             results['trakt']['message'] = f"❌ Error testing Trakt API: {str(e)}"
     
     # Check Emby configuration
-    required_emby = {
-        'EMBY_API_KEY': get_config('EMBY_API_KEY'),
-        'EMBY_SERVER': get_config('EMBY_SERVER'),
-        'EMBY_ADMIN_USER_ID': get_config('EMBY_ADMIN_USER_ID'),
-        'EMBY_MOVIES_LIBRARY_ID': get_config('EMBY_MOVIES_LIBRARY_ID'),
-        'EMBY_TV_LIBRARY_ID': get_config('EMBY_TV_LIBRARY_ID')
-    }
+    required_emby = {key: os.environ.get(key, '') for key in _EMBY_REQUIRED_KEYS}
     
     missing_emby = [key for key, value in required_emby.items() if not value]
     
@@ -603,26 +1118,33 @@ def check_configuration():
             }
             
             # Test System Info
-            response = requests.get(f"{emby_server}/System/Info/Public", headers=headers)
+            response = http.get(f"{emby_server}/System/Info/Public", headers=headers, timeout=HTTP_TIMEOUT)
             
             if response.status_code == 200:
-                # Test library access
-                movies_response = requests.get(
-                    f"{emby_server}/Items",
-                    headers=headers,
-                    params={
-                        "ParentId": required_emby['EMBY_MOVIES_LIBRARY_ID'],
-                        "Limit": 1
-                    }
-                )
-                shows_response = requests.get(
-                    f"{emby_server}/Items",
-                    headers=headers,
-                    params={
-                        "ParentId": required_emby['EMBY_TV_LIBRARY_ID'],
-                        "Limit": 1
-                    }
-                )
+                # Test access to each library (concurrently, as the probes are independent)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    movies_future = executor.submit(
+                        http.get,
+                        f"{emby_server}/Items",
+                        headers=headers,
+                        params={
+                            "ParentId": required_emby['EMBY_MOVIES_LIBRARY_ID'],
+                            "Limit": 1
+                        },
+                        timeout=HTTP_TIMEOUT
+                    )
+                    shows_future = executor.submit(
+                        http.get,
+                        f"{emby_server}/Items",
+                        headers=headers,
+                        params={
+                            "ParentId": required_emby['EMBY_TV_LIBRARY_ID'],
+                            "Limit": 1
+                        },
+                        timeout=HTTP_TIMEOUT
+                    )
+                    movies_response = movies_future.result()
+                    shows_response = shows_future.result()
                 
                 if movies_response.status_code == 200 and shows_response.status_code == 200:
                     results['emby']['status'] = True
@@ -644,79 +1166,60 @@ def check_configuration():
 # Add function to check Emby connection status
 def check_emby_status():
     """Check if Emby server is accessible"""
-    server_url = get_config('EMBY_SERVER')
-    api_key = get_config('EMBY_API_KEY')
+    server_url = _cached_get_config('EMBY_SERVER')
+    api_key = _cached_get_config('EMBY_API_KEY')
     
     if not server_url or not api_key:
         return False
     
     try:
         headers = {'X-Emby-Token': api_key}
-        response = requests.get(f"{server_url.rstrip('/')}/System/Info", headers=headers, timeout=5)
+        response = _http_session().get(f"{server_url.rstrip('/')}/System/Info", headers=headers, timeout=HTTP_TIMEOUT)
         return response.status_code == 200
     except Exception:
         return False
 
+# Connection status shown on the Main page, probed at most every 30 seconds
+@st.cache_data(ttl=30)
+def _cached_token_status():
+    """Cached result of check_token_status (which refreshes the Trakt token)"""
+    return check_token_status()
+
+@st.cache_data(ttl=30)
+def _cached_emby_status():
+    """Cached result of check_emby_status"""
+    return check_emby_status()
+
+# PID file written by console_runner.py next to itself (so not relative to the working directory)
+# while the scheduler is running
+CONSOLE_RUNNER_PID_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'console_runner.pid')
+
 # Add function to quit the application
 def quit_application():
     """Quit the application and any running console_runner.py process"""
-    # Try to find and kill console_runner.py process
+    import signal
+    import sys
+    
+    # console_runner.py records its PID when it starts the scheduler, so only that process is stopped
     try:
-        import os
-        import signal
-        import subprocess
-        
-        # On Windows, use taskkill to forcefully terminate Python processes running console_runner.py
-        if os.name == 'nt':  # Windows
-            try:
-                # Use tasklist to find Python processes
-                result = subprocess.run(
-                    ['tasklist', '/FI', 'IMAGENAME eq python.exe', '/FO', 'CSV'], 
-                    capture_output=True, 
-                    text=True, 
-                    check=True
-                )
-                
-                # Kill the Streamlit process
-                subprocess.run(['taskkill', '/F', '/IM', 'streamlit.exe'], 
-                               capture_output=True, 
-                               check=False)
-                
-                # Kill Python processes
-                subprocess.run(['taskkill', '/F', '/IM', 'python.exe'], 
-                               capture_output=True, 
-                               check=False)
-                
-                print("Terminated all Python processes")
-            except subprocess.SubprocessError as e:
-                print(f"Error terminating processes: {e}")
-        else:  # Unix-like systems
-            try:
-                # Use ps and grep to find Python processes running console_runner.py
-                ps_output = subprocess.check_output(
-                    ['ps', '-ef'], 
-                    text=True
-                )
-                
-                for line in ps_output.splitlines():
-                    if 'python' in line and 'console_runner.py' in line:
-                        # Extract PID (second column in ps output)
-                        pid = int(line.split()[1])
-                        os.kill(pid, signal.SIGTERM)
-                        print(f"Terminated console_runner.py process (PID: {pid})")
-            except (subprocess.SubprocessError, ValueError) as e:
-                print(f"Error terminating processes: {e}")
-    except ImportError:
-        # subprocess not available
-        pass
+        if os.path.exists(CONSOLE_RUNNER_PID_FILE):
+            with open(CONSOLE_RUNNER_PID_FILE, 'r') as f:
+                pid = int(f.read().strip())
+            os.remove(CONSOLE_RUNNER_PID_FILE)
+            os.kill(pid, signal.SIGTERM)
+            print(f"Terminated console_runner.py process (PID: {pid})")
+    except (OSError, ValueError) as e:
+        print(f"Error terminating console_runner.py: {e}")
     
     # Exit the current process
-    import sys
     sys.exit(0)
 
 # Check for missing configuration
 missing_config = check_required_config()
 
+# Messages queued by the previous run
+show_queued_toast()
+
 # Navigation
 st.sidebar.title("Navigation")
 
@@ -724,9 +1227,8 @@ st.sidebar.title("Navigation")
 if missing_config:
     st.sidebar.error("⚠️ Configuration Required")
     st.sidebar.warning("Please complete the configuration in Settings:")
-    for category, items in missing_config.items():
-        for item in items:
-            st.sidebar.info(f"• {item}")
+    # One element for the whole list; the trailing double space keeps each item on its own line
+    st.sidebar.info('  \n'.join(f"• {item}" for items in missing_config.values() for item in items))
     
     # Force settings page if configuration is missing
     page = "Settings"
@@ -744,6 +1246,10 @@ if page == "Settings":
             "All fields marked with ⚠️ are required."
         )
     
+    # Work out once which settings groups are incomplete, for the tab banners
+    missing_list = missing_config.get('Missing Configuration', [])
+    has_missing = {k: any(k in v for v in missing_list) for k in ('TRAKT', 'EMBY')}
+    
     # Create tabs for different settings categories
     tab1, tab2, tab3 = st.tabs(["Sync Schedule", "Trakt Configuration", "Emby Configuration"])
     
@@ -751,36 +1257,32 @@ if page == "Settings":
         st.header("Sync Schedule")
         
         # Get current sync interval with default value
-        current_interval = get_config('SYNC_INTERVAL') or '6h'
-        
-        interval_options = {
-            '6h': 'Every 6 Hours',
-            '1d': 'Daily',
-            '1w': 'Weekly',
-            '2w': 'Fortnightly',
-            '1m': 'Monthly',
-            '1min': 'Every Minute (TESTING)',
-        }
+        current_interval = _cached_get_config('SYNC_INTERVAL') or '6h'
         
         # Use default '6h' if current_interval is not in options
-        if current_interval not in interval_options:
+        if current_interval not in _INTERVAL_OPTIONS:
             current_interval = '6h'
         
         selected_interval = st.selectbox(
             "Sync Frequency",
-            options=list(interval_options.keys()),
-            format_func=lambda x: interval_options[x],
-            index=list(interval_options.keys()).index(current_interval)
+            options=_INTERVAL_KEYS,
+            format_func=_INTERVAL_OPTIONS.__getitem__,
+            index=_INTERVAL_IDX[current_interval]
         )
         
         # Get current sync time if it exists
-        current_time = get_config('SYNC_TIME') or '00:00'
+        current_time = _cached_get_config('SYNC_TIME') or '00:00'
         
         # Only show time selection for intervals that are daily or longer
         if selected_interval in ['1d', '1w', '2w', '1m']:
+            # Only re-parse the stored time when it changed since the last rerun
+            if st.session_state.get('_sync_time_raw') != current_time:
+                st.session_state._sync_time_parsed = datetime.strptime(current_time, '%H:%M').time()
+                st.session_state._sync_time_raw = current_time
+            
             sync_time = st.time_input(
                 "Time of day to sync",
-                datetime.strptime(current_time, '%H:%M').time(),
+                st.session_state._sync_time_parsed,
                 help="Select the time of day when the sync should run"
             )
             # Convert time to string format HH:MM
@@ -794,13 +1296,12 @@ if page == "Settings":
         # Add day selection for weekly and fortnightly schedules
         if selected_interval in ['1w', '2w']:
             # Get current day setting or default to Monday
-            current_day = get_config('SYNC_DAY') or 'Monday'
-            days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+            current_day = _cached_get_config('SYNC_DAY') or 'Monday'
             
             selected_day = st.selectbox(
                 "Day of the week",
-                options=days_of_week,
-                index=days_of_week.index(current_day) if current_day in days_of_week else 0,
+                options=_DAYS_OF_WEEK,
+                index=_WEEKDAY_INDEX.get(current_day, 0),
                 help="Select the day of the week when the sync should run"
             )
             
@@ -813,7 +1314,7 @@ if page == "Settings":
         if selected_interval == '1m':
             # Get current date setting or default to 1
             try:
-                current_date = int(get_config('SYNC_DATE') or '1')
+                current_date = int(_cached_get_config('SYNC_DATE') or '1')
             except ValueError:
                 current_date = 1
             
@@ -836,21 +1337,26 @@ if page == "Settings":
             st.success("✅ Sync schedule updated!")
         
         # Show next sync time based on schedule
+        scheduled_time = _cached_get_config('SYNC_TIME') or '00:00'
         if selected_interval == '6h':
             st.info("🕒 Sync will run every 6 hours")
         elif selected_interval == '1d':
-            st.info(f"🕒 Sync will run daily at {get_config('SYNC_TIME') or '00:00'}")
+            st.info(f"🕒 Sync will run daily at {scheduled_time}")
         elif selected_interval == '1w':
-            sync_day = get_config('SYNC_DAY') or 'Monday'
-            st.info(f"🕒 Sync will run weekly on {sync_day} at {get_config('SYNC_TIME') or '00:00'}")
+            sync_day = _cached_get_config('SYNC_DAY') or 'Monday'
+            st.info(f"🕒 Sync will run weekly on {sync_day} at {scheduled_time}")
         elif selected_interval == '2w':
-            sync_day = get_config('SYNC_DAY') or 'Monday'
-            next_date = get_next_occurrence_date(sync_day)
-            st.info(f"🕒 Sync will run fortnightly on {sync_day} at {get_config('SYNC_TIME') or '00:00'}")
+            sync_day = _cached_get_config('SYNC_DAY') or 'Monday'
+            next_date = _cached_next_occurrence(sync_day, datetime.now().date().isoformat())
+            # Skip to the following week if that day is in the schedulers' off week
+            epoch = get_fortnightly_epoch(sync_day, scheduled_time) or datetime.now().date()
+            if not is_fortnightly_week(next_date.date(), epoch):
+                next_date += timedelta(days=7)
+            st.info(f"🕒 Sync will run fortnightly on {sync_day} at {scheduled_time}")
             st.info(f"🗓️ The next sync will be on {next_date.strftime('%Y-%m-%d')}")
         elif selected_interval == '1m':
-            sync_date = get_config('SYNC_DATE') or '1'
-            st.info(f"🕒 Sync will run monthly on the {sync_date}{get_ordinal_suffix(int(sync_date))} at {get_config('SYNC_TIME') or '00:00'}")
+            sync_date = _cached_get_config('SYNC_DATE') or '1'
+            st.info(f"🕒 Sync will run monthly on the {sync_date}{get_ordinal_suffix(int(sync_date))} at {scheduled_time}")
         elif selected_interval == '1min':
             st.info("🕒 Sync will run every minute (TESTING)")
 
@@ -873,41 +1379,38 @@ if page == "Settings":
     with tab2:
         st.header("Trakt Configuration")
         
-        if any(var for var in missing_config.get('Missing Configuration', []) if 'TRAKT' in var):
+        trakt_missing = has_missing['TRAKT']
+        if trakt_missing:
             st.error("⚠️ Required Trakt settings are missing")
         
-        st.markdown("""
-        ### How to get Trakt API Credentials:
-        1. Visit [Trakt API Settings](https://trakt.tv/oauth/applications)
-        2. Click "New Application"
-        3. Fill in the application details:
-           - Name: "Trakt2EmbySync" (or any name you prefer)
-           - Redirect URI: urn:ietf:wg:oauth:2.0:oob
-           - Javascript Origins: Leave blank
-        4. Click "Save App"
-        5. You'll see your Client ID and Client Secret
-        """)
-        
-        # Trakt Client ID
-        trakt_client_id = st.text_input(
-            "Trakt Client ID ⚠️",
-            value=get_config('TRAKT_CLIENT_ID'),
-            help="The Client ID from your Trakt API application"
-        )
-        if trakt_client_id != get_config('TRAKT_CLIENT_ID'):
-            set_config('TRAKT_CLIENT_ID', trakt_client_id)
-            st.success("✅ Trakt Client ID updated!")
+        with st.expander("Setup instructions", expanded=trakt_missing):
+            st.markdown(_TRAKT_SETUP_DOCS)
         
-        # Trakt Client Secret
-        trakt_client_secret = st.text_input(
-            "Trakt Client Secret ⚠️",
-            value=get_config('TRAKT_CLIENT_SECRET'),
-            help="The Client Secret from your Trakt API application",
-            type="password"
-        )
-        if trakt_client_secret != get_config('TRAKT_CLIENT_SECRET'):
-            set_config('TRAKT_CLIENT_SECRET', trakt_client_secret)
-            st.success("✅ Trakt Client Secret updated!")
+        # Edits are only applied when the form is submitted
+        with st.form("trakt_cfg"):
+            # Trakt Client ID
+            trakt_client_id = st.text_input(
+                "Trakt Client ID ⚠️",
+                value=_cached_get_config('TRAKT_CLIENT_ID'),
+                help="The Client ID from your Trakt API application"
+            )
+            
+            # Trakt Client Secret
+            trakt_client_secret = st.text_input(
+                "Trakt Client Secret ⚠️",
+                value=_cached_get_config('TRAKT_CLIENT_SECRET'),
+                help="The Client Secret from your Trakt API application",
+                type="password"
+            )
+            
+            if st.form_submit_button("Save Trakt Settings"):
+                if save_config_form({
+                    'TRAKT_CLIENT_ID': trakt_client_id,
+                    'TRAKT_CLIENT_SECRET': trakt_client_secret
+                }):
+                    st.success("✅ Trakt configuration updated!")
+                else:
+                    st.info("No changes to save")
             
         # Add Check Trakt Configuration button
         if st.button("Check Trakt Configuration"):
@@ -918,74 +1421,46 @@ if page == "Settings":
     with tab3:
         st.header("Emby Configuration")
         
-        if any(var for var in missing_config.get('Missing Configuration', []) if 'EMBY' in var):
+        emby_missing = has_missing['EMBY']
+        if emby_missing:
             st.error("⚠️ Required Emby settings are missing")
         
-        st.markdown("""
-        ### How to get Emby Configuration:
-        
-        #### API Key:
-        1. Open Emby Dashboard
-        2. Click on your username in the top right
-        3. Select "Profile"
-        4. Go to "API Keys" (or "Api Keys" in some versions)
-        5. Click "+" to create a new key
-        6. Enter a name like "Trakt2EmbySync" and click "Ok"
-        7. Copy the generated API key
-        
-        #### Server URL:
-        - Your Emby server URL (e.g., http://localhost:8096 or your remote URL)
-        - Include http:// or https:// and any port numbers
-        - Don't include trailing slashes
+        with st.expander("Setup instructions", expanded=emby_missing):
+            st.markdown(_EMBY_SETUP_DOCS)
         
-        #### Admin User ID:
-        1. Go to Emby Dashboard
-        2. Click on "Users"
-        3. Click on your admin user
-        4. The ID is in the URL (e.g., .../web/dashboard/users/edit?userId=**THIS_IS_YOUR_ID**)
-        
-        #### Library IDs:
-        You can specify different Emby libraries for each Trakt list in the Main page.
-        To find your library IDs:
-        1. Go to Emby Dashboard
-        2. Click "Libraries"
-        3. Click on your library (Movies, TV Shows, Movies 4K, etc.)
-        4. The ID is in the URL (e.g., .../web/dashboard/library?parentId=**THIS_IS_YOUR_ID**)
-        """)
-        
-        # Emby Server URL
-        emby_server = st.text_input(
-            "Emby Server URL ⚠️",
-            value=get_config('EMBY_SERVER'),
-            help="Your Emby server URL (e.g., http://localhost:8096)"
-        )
-        if emby_server != get_config('EMBY_SERVER'):
-            set_config('EMBY_SERVER', emby_server)
-            st.success("✅ Emby Server URL updated!")
-        
-        # Emby API Key
-        emby_api_key = st.text_input(
-            "Emby API Key ⚠️",
-            value=get_config('EMBY_API_KEY'),
-            help="Your Emby API key from your user profile",
-            type="password"
-        )
-        if emby_api_key != get_config('EMBY_API_KEY'):
-            set_config('EMBY_API_KEY', emby_api_key)
-            st.success("✅ Emby API Key updated!")
+        # Edits are only applied when the form is submitted
+        with st.form("emby_cfg"):
+            # Emby Server URL
+            emby_server = st.text_input(
+                "Emby Server URL ⚠️",
+                value=_cached_get_config('EMBY_SERVER'),
+                help="Your Emby server URL (e.g., http://localhost:8096)"
+            )
             
-            # Force environment refresh when API key changes
-            load_dotenv(override=True)
-        
-        # Emby Admin User ID
-        emby_admin_user_id = st.text_input(
-            "Emby Admin User ID ⚠️",
-            value=get_config('EMBY_ADMIN_USER_ID'),
-            help="Your Emby admin user ID"
-        )
-        if emby_admin_user_id != get_config('EMBY_ADMIN_USER_ID'):
-            set_config('EMBY_ADMIN_USER_ID', emby_admin_user_id)
-            st.success("✅ Emby Admin User ID updated!")
+            # Emby API Key
+            emby_api_key = st.text_input(
+                "Emby API Key ⚠️",
+                value=_cached_get_config('EMBY_API_KEY'),
+                help="Your Emby API key from your user profile",
+                type="password"
+            )
+            
+            # Emby Admin User ID
+            emby_admin_user_id = st.text_input(
+                "Emby Admin User ID ⚠️",
+                value=_cached_get_config('EMBY_ADMIN_USER_ID'),
+                help="Your Emby admin user ID"
+            )
+            
+            if st.form_submit_button("Save Emby Settings"):
+                if save_config_form({
+                    'EMBY_SERVER': emby_server,
+                    'EMBY_API_KEY': emby_api_key,
+                    'EMBY_ADMIN_USER_ID': emby_admin_user_id
+                }):
+                    st.success("✅ Emby configuration updated!")
+                else:
+                    st.info("No changes to save")
         
         # Add Check Emby Configuration button
         if st.button("Check Emby Connection"):
@@ -997,36 +1472,41 @@ if page == "Settings":
         st.header("Library Management")
         st.markdown("Add your Emby libraries here with friendly names. These will be available for selection when adding Trakt lists.")
         
-        # Display existing libraries
-        for i, library in enumerate(st.session_state.emby_libraries):
-            col1, col2, col3, col4 = st.columns([3, 3, 2, 1])
-            
-            with col1:
-                st.write("Library Name")
-                new_name = st.text_input("##", library['name'], key=f"lib_name_{i}", label_visibility="collapsed")
-            with col2:
-                st.write("Library ID")
-                new_id = st.text_input("##", library['id'], key=f"lib_id_{i}", label_visibility="collapsed")
-            with col3:
-                st.write("Type")
-                new_type = st.selectbox("##", ["movies", "shows"], 
-                                       index=0 if library['type'] == "movies" else 1,
-                                       key=f"lib_type_{i}",
-                                       label_visibility="collapsed")
-            with col4:
-                st.write("Action")
-                st.button("Delete", key=f"lib_delete_{i}", use_container_width=True, on_click=lambda i=i: delete_library(i))
-            
-            # Update library if values changed
-            if (new_name != library['name'] or 
-                new_id != library['id'] or 
-                new_type != library['type']):
-                library.update({
-                    'name': new_name,
-                    'id': new_id,
-                    'type': new_type
-                })
-                save_emby_libraries()
+        # Display existing libraries; edits are staged in a form and saved together on submit
+        if st.session_state.emby_libraries:
+            with st.form("libs_edit"):
+                # Column headers once, instead of a label above every row's inputs
+                header = st.columns([3, 3, 2, 1])
+                for column, label in zip(header, ("Library Name", "Library ID", "Type", "Delete")):
+                    column.markdown(f"**{label}**")
+                
+                staged = []
+                for i, library in enumerate(st.session_state.emby_libraries):
+                    col1, col2, col3, col4 = st.columns([3, 3, 2, 1])
+                    
+                    with col1:
+                        new_name = st.text_input("##", library['name'], key=f"lib_name_{i}", label_visibility="collapsed")
+                    with col2:
+                        new_id = st.text_input("##", library['id'], key=f"lib_id_{i}", label_visibility="collapsed")
+                    with col3:
+                        new_type = st.selectbox("##", ["movies", "shows"], 
+                                               index=0 if library['type'] == "movies" else 1,
+                                               key=f"lib_type_{i}",
+                                               label_visibility="collapsed")
+                    with col4:
+                        remove = st.checkbox("##", key=f"lib_remove_{i}", label_visibility="collapsed")
+                    
+                    staged.append((remove, {
+                        'name': new_name,
+                        'id': new_id,
+                        'type': new_type
+                    }))
+                
+                if st.form_submit_button("Apply Library Changes", use_container_width=True):
+                    if apply_library_edits(staged):
+                        st.rerun()
+                    else:
+                        st.info("No changes to save")
         
         # Add new library
         with st.form("new_library_form"):
@@ -1107,35 +1587,17 @@ elif page == "Missing Items":
         st.info("No missing items. All Trakt items have been found in Emby!")
     else:
         # Group items by collection
-        collections = {}
-        for i, item in enumerate(missing_items):
-            # Handle both old and new format
-            if 'collections' in item and item['collections']:
-                for collection_info in item['collections']:
-                    collection = collection_info.get('name', 'Unknown')
-                    if collection not in collections:
-                        collections[collection] = []
-                    # Only add the item once per collection
-                    if not any(idx == i for idx, _ in collections[collection]):
-                        collections[collection].append((i, item))
-            else:  # Fallback to old format
-                collection = item.get('collection_name', 'Unknown')
-                if collection not in collections:
-                    collections[collection] = []
-                collections[collection].append((i, item))
+        collections = _group_missing_by_collection(missing_items)
         
         # Action buttons at the top
         col1, col2 = st.columns([1, 4])
         with col1:
             if st.button("Recheck All", type="primary"):
-                recheck_results = []
                 with st.spinner("Rechecking all missing items..."):
-                    for i in range(len(missing_items)):
-                        success, message = recheck_missing_item(i)
-                        if success:
-                            recheck_results.append(f"✅ {missing_items[i]['title']}: {message}")
-                        else:
-                            recheck_results.append(f"❌ {missing_items[i]['title']}: {message}")
+                    recheck_results = [
+                        f"{'✅' if success else '❌'} {title}: {message}"
+                        for title, success, message in recheck_missing_items_bulk([missing_item_key(item) for item in missing_items])
+                    ]
                 
                 # Show results in an expander
                 with st.expander("Recheck Results", expanded=True):
@@ -1146,25 +1608,21 @@ elif page == "Missing Items":
                 st.rerun()
         
         # Button to ignore all selected items
-        selected_items = []
         st.subheader("Bulk Actions")
         with st.expander("Select items to ignore", expanded=False):
             
-            # Create a selectbox for each collection
+            # One multiselect over all items (labelled with their first collection) instead of a checkbox per item
+            item_labels = {}
             for collection, items in collections.items():
-                st.write(f"**{collection}** ({len(items)} items)")
-                
-                # Create three columns for more compact UI
-                cols = st.columns(3)
-                
-                # Create checkboxes for all items in this collection
-                for i, (index, item) in enumerate(items):
-                    col_idx = i % 3  # Distribute across 3 columns
-                    title = item.get('title', 'Unknown')
-                    year = item.get('year', '')
-                    with cols[col_idx]:
-                        if st.checkbox(f"{title} ({year})", key=f"select_{collection}_{index}"):
-                            selected_items.append(index)
+                for key, item in items:
+                    if key not in item_labels:
+                        item_labels[key] = f"{item.get('title', 'Unknown')} ({item.get('year', '')}) — {collection}"
+            selected_items = st.multiselect(
+                "Items to ignore",
+                options=list(item_labels),
+                format_func=item_labels.__getitem__,
+                key="select_items_to_ignore"
+            )
             
             # Show selected count and Add ignore button if items are selected
             if selected_items:
@@ -1178,87 +1636,60 @@ elif page == "Missing Items":
                         else:
                             st.error(message)
         
-        # Display items by collection in collapsible expanders
+        # Display items by collection; a collection's widgets are only built while its toggle is on
         st.subheader("Missing Items by Collection")
         for collection, items in collections.items():
-            with st.expander(f"{collection} ({len(items)} items)", expanded=False):
-                for i, (index, item) in enumerate(items):
-                    with st.container():
-                        col1, col2, col3 = st.columns([2, 2, 1])
-                        
-                        with col1:
-                            title = item.get('title', 'Unknown')
-                            year = item.get('year', '')
-                            media_type = item.get('type', 'movie').capitalize()
-                            st.subheader(f"{title} ({year})")
-                            st.write(f"Type: {media_type}")
-                            
-                            # Show provider IDs
-                            trakt_ids = item.get('ids', {})
-                            if trakt_ids:
-                                show_ids = st.toggle("Show Trakt IDs", key=f"show_ids_{index}", value=False)
-                                if show_ids:
-                                    st.write("**Trakt IDs:**")
-                                    for id_type, id_value in trakt_ids.items():
-                                        st.write(f"- **{id_type}**: {id_value}")
+            if st.toggle(f"{collection} ({len(items)} items)", key=f"open_missing_{collection}"):
+                # Read-only details for the whole collection go into one table
+                st.markdown(_missing_items_table(items))
+                
+                # Only the interactive widgets get a row of columns per item; widget keys use the
+                # item's key rather than its position, so state stays with the item across removals
+                for key, item in items:
+                    widget_key = f"{collection}_{key}"
+                    title = item.get('title', 'Unknown')
+                    year = item.get('year', '')
+                    col1, col2, col3 = st.columns([2, 2, 1])
                     
-                        with col2:
-                            st.text(f"Last checked: {item.get('last_checked', 'Never')}")
-                            st.text(f"Reason: {item.get('reason', 'Unknown')}")
-                            
-                            # Display collections the item belongs to
-                            if 'collections' in item and len(item['collections']) > 0:
-                                collections_list = [c.get('name', 'Unknown') for c in item.get('collections', [])]
-                                if collections_list:
-                                    st.write(f"**In collections:** {', '.join(collections_list)}")
-                            
-                            # Manual URL input
-                            emby_url = st.text_input("Manual Emby URL", key=f"url_{index}", 
-                                                   placeholder="Paste Emby URL here...")
-                            
-                            # Add ignore toggle
-                            ignore = st.toggle("Ignore this item", key=f"ignore_{index}", value=False)
-                            if ignore:
-                                if st.button("Confirm Ignore", key=f"confirm_ignore_{index}"):
-                                    with st.spinner(f"Ignoring {title}..."):
-                                        success, message = ignore_missing_item(index)
-                                        if success:
-                                            st.success(message)
-                                            st.rerun()
-                                        else:
-                                            st.error(message)
+                    with col1:
+                        # Manual URL input
+                        emby_url = st.text_input(f"Manual Emby URL for {title} ({year})", key=f"url_{widget_key}", 
+                                               placeholder="Paste Emby URL here...")
                     
-                        with col3:
-                            # Extract Emby ID from URL if provided
-                            emby_id = None
-                            if emby_url:
-                                # Try to extract ID from URL - enhanced pattern matching for more URL formats
-                                import re
-                                # Handle multiple Emby URL patterns:
-                                # 1. /item?id=XXX format
-                                # 2. /item/XXX format
-                                # 3. /Details/XXX format
-                                # 4. /web/index.html#!/item?id=XXX format
-                                # 5. /web/index.html#!/Details/XXX format
-                                match = re.search(r'(?:item\?id=|item/|Details/|emby\.dll\?id=|\#!/item\?id=|\#!/Details/)([^&\s/#]+)', emby_url)
-                                if match:
-                                    emby_id = match.group(1)
-                                    st.info(f"Extracted Emby ID: {emby_id}")
-                                else:
-                                    st.warning("Could not extract Emby ID from URL. Please make sure you're using the direct link to the item in Emby.")
-                            
-                            # Recheck button with extracted ID
-                            if st.button("Recheck", key=f"recheck_{index}"):
-                                with st.spinner(f"Rechecking {title}..."):
-                                    success, message = recheck_missing_item(index, emby_id)
-                            
-                                if success:
-                                    st.success(message)
-                                    st.rerun()
-                                else:
-                                    st.error(message)
+                    with col2:
+                        # Add ignore toggle
+                        ignore = st.toggle("Ignore this item", key=f"ignore_{widget_key}", value=False)
+                        if ignore:
+                            if st.button("Confirm Ignore", key=f"confirm_ignore_{widget_key}"):
+                                with st.spinner(f"Ignoring {title}..."):
+                                    success, message = ignore_missing_item(key)
+                                    if success:
+                                        st.success(message)
+                                        st.rerun()
+                                    else:
+                                        st.error(message)
                     
-                    st.divider()
+                    with col3:
+                        # Extract Emby ID from URL if provided
+                        emby_id = None
+                        if emby_url:
+                            # Try to extract ID from URL - enhanced pattern matching for more URL formats
+                            emby_id = extract_emby_id_from_url(emby_url)
+                            if emby_id:
+                                st.info(f"Extracted Emby ID: {emby_id}")
+                            else:
+                                st.warning("Could not extract Emby ID from URL. Please make sure you're using the direct link to the item in Emby.")
+                        
+                        # Recheck button with extracted ID
+                        if st.button("Recheck", key=f"recheck_{widget_key}"):
+                            with st.spinner(f"Rechecking {title}..."):
+                                success, message = recheck_missing_item(key, emby_id)
+                        
+                            if success:
+                                st.success(message)
+                                st.rerun()
+                            else:
+                                st.error(message)
 
 elif page == "Ignored Items":
     st.title("Ignored Items")
@@ -1271,24 +1702,12 @@ elif page == "Ignored Items":
         st.info("No ignored items.")
     else:
         # Group items by collection
-        collections = {}
-        for i, item in enumerate(ignored_items):
-            # Get collection name - handle both old and new format
-            if 'collections' in item and item['collections']:
-                # New format - use first collection in the list
-                collection = item['collections'][0].get('name', 'Unknown')
-            else:
-                # Old format or fallback
-                collection = item.get('collection_name', 'Unknown')
-                
-            if collection not in collections:
-                collections[collection] = []
-            collections[collection].append((i, item))
+        collections = _group_ignored_by_collection(ignored_items)
         
-        # Display items by collection in collapsible expanders
+        # Display items by collection; a collection's widgets are only built while its toggle is on
         for collection, items in collections.items():
-            with st.expander(f"{collection} ({len(items)} items)", expanded=False):
-                for i, (index, item) in enumerate(items):
+            if st.toggle(f"{collection} ({len(items)} items)", key=f"open_ignored_{collection}"):
+                for key, item, collections_str in items:
                     with st.container():
                         col1, col2, col3 = st.columns([2, 2, 1])
                         
@@ -1302,7 +1721,7 @@ elif page == "Ignored Items":
                             # Show provider IDs
                             trakt_ids = item.get('ids', {})
                             if trakt_ids:
-                                show_ids = st.toggle("Show Trakt IDs", key=f"show_ids_{index}", value=False)
+                                show_ids = st.toggle("Show Trakt IDs", key=f"show_ids_{key}", value=False)
                                 if show_ids:
                                     st.write("**Trakt IDs:**")
                                     for id_type, id_value in trakt_ids.items():
@@ -1313,15 +1732,13 @@ elif page == "Ignored Items":
                             st.text(f"Ignored on: {item.get('ignored_on', 'Unknown')}")
                             
                             # Display all collections the item belongs to
-                            if 'collections' in item and len(item['collections']) > 0:
-                                collections_list = [c.get('name', 'Unknown') for c in item.get('collections', [])]
-                                if collections_list:
-                                    st.write(f"**In collections:** {', '.join(collections_list)}")
+                            if collections_str:
+                                st.write(f"**In collections:** {collections_str}")
                     
                         with col3:
                             # Unignore button
-                            if st.button("Unignore", key=f"unignore_{index}"):
-                                unignore_item(index)
+                            if st.button("Unignore", key=f"unignore_{key}"):
+                                unignore_item(key)
                                 st.success(f"{title} has been unignored.")
                                 st.rerun()
                     
@@ -1352,7 +1769,7 @@ else:  # Main page
             
             with status_col1:
                 # Check Trakt status
-                token_valid, token_message = check_token_status()
+                token_valid, token_message = _cached_token_status()
                 if token_valid:
                     st.markdown("Trakt Status: 🟢 Connected")
                 else:
@@ -1360,7 +1777,7 @@ else:  # Main page
             
             with status_col2:
                 # Check Emby status
-                emby_status = check_emby_status()
+                emby_status = _cached_emby_status()
                 if emby_status:
                     st.markdown("Emby Status: 🟢 Connected")
                 else:
@@ -1369,6 +1786,11 @@ else:  # Main page
             # Display last sync time if available
             if st.session_state.last_sync:
                 st.caption(f"Last Sync: {st.session_state.last_sync.strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            if st.button("Refresh Status", key="refresh_status"):
+                _cached_token_status.clear()
+                _cached_emby_status.clear()
+                st.rerun()
         
         with col2:
             # Sync button
@@ -1380,6 +1802,9 @@ else:  # Main page
                         with st.spinner("Starting Trakt authentication..."):
                             device_code, user_code, interval = get_trakt_device_code()
                             if device_code and user_code:
+                                # Drop any earlier attempt and its background poller
+                                _cancel_trakt_auth()
+                                
                                 # Store authentication details in session state
                                 st.session_state.trakt_auth_in_progress = True
                                 st.session_state.trakt_device_code = device_code
@@ -1395,202 +1820,56 @@ else:  # Main page
             if st.button("Quit", type="secondary", use_container_width=True):
                 quit_application()
         
-        # Token Status and Sync Button
-        token_valid, token_message = check_token_status()
-
-        # Create placeholders for status and progress
-        status_placeholder = st.empty()
-        progress_placeholder = st.empty()
-
-        # Handle sync if in progress
-        if st.session_state.sync_in_progress:
-            try:
-                access_token = get_access_token()
-                if access_token:
-                    for trakt_list in st.session_state.trakt_lists:
-                        sync_trakt_list_to_emby(trakt_list, access_token, process_sync_status)
-                        
-                        # Show current status and progress
-                        status_placeholder.text(st.session_state.current_message)
-                        
-                        with progress_placeholder.container():
-                            for collection_name, progress_data in st.session_state.sync_progress.items():
-                                if collection_name:  # Only show progress for actual collections
-                                    progress = progress_data['progress']
-                                    processed = progress_data['processed']
-                                    total = progress_data['total']
-                                    
-                                    st.write(f"**{collection_name}**")
-                                    st.progress(progress)
-                                    st.write(f"Processed {processed} of {total} items")
-                
-                    st.session_state.last_sync = datetime.now()
-                    st.session_state.sync_in_progress = False
-                    st.success("👍 Sync completed successfully!")
-                    time.sleep(2)
-                    st.rerun()
-                else:
-                    st.error("Failed to sync with Trakt")
-                    st.session_state.sync_in_progress = False
-            except Exception as e:
-                st.error(f"An error occurred during sync: {str(e)}")
-                st.session_state.sync_in_progress = False
-                st.session_state.sync_progress = {}
-                st.session_state.current_message = ""
-
-        # Show current status and progress if active
-        if st.session_state.current_message:
-            status_placeholder.text(st.session_state.current_message)
-
-        if st.session_state.sync_progress:
-            with progress_placeholder.container():
-                for collection_name, progress_data in st.session_state.sync_progress.items():
-                    if collection_name:  # Only show progress for actual collections
-                        progress = progress_data['progress']
-                        processed = progress_data['processed']
-                        total = progress_data['total']
-                        
-                        st.write(f"**{collection_name}**")
-                        st.progress(progress)
-                        st.write(f"Processed {processed} of {total} items")
-
-        # If authentication is in progress, create a container to show status
-        if st.session_state.trakt_auth_in_progress and st.session_state.trakt_device_code:
-            auth_container = st.container()
-            
-            with auth_container:
-                st.info("Please authenticate with Trakt:")
-                st.markdown("### [Click here to authorize](https://trakt.tv/activate)")
-                
-                # Make the code more prominent
-                st.markdown("### Your Authorization Code:")
-                st.code(st.session_state.trakt_user_code, language=None)
-                
-                # Add explicit instructions
-                st.markdown("""
-                1. Click the link above to open Trakt's activation page
-                2. Enter the code shown above
-                3. Authorize this application
-                4. Return here and click 'Continue' when done
-                """)
-                
-                # Add a button to confirm the user has completed authorization
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("Continue", key="start_polling"):
-                        st.session_state.auth_polling_started = True
-                        st.rerun()
-                with col2:
-                    if st.button("Cancel", key="cancel_auth"):
-                        st.session_state.trakt_auth_in_progress = False
-                        st.session_state.trakt_device_code = None
-                        st.session_state.trakt_user_code = None
-                        st.session_state.trakt_poll_interval = None
-                        st.session_state.auth_polling_started = False
-                        st.rerun()
-
-                # Only start polling after the user clicks 'Continue'
-                if st.session_state.auth_polling_started:
-                    with st.spinner("Verifying authorization..."):
-                        # Poll for access token
-                        access_token = poll_for_access_token(
-                            st.session_state.trakt_device_code, 
-                            st.session_state.trakt_poll_interval
-                        )
-                        
-                        if access_token:
-                            # Authentication successful - reset auth state and continue with sync
-                            st.session_state.trakt_auth_in_progress = False
-                            st.session_state.trakt_device_code = None
-                            st.session_state.trakt_user_code = None
-                            st.session_state.trakt_poll_interval = None
-                            st.session_state.auth_polling_started = False
-                            st.session_state.auth_complete = True
-                            
-                            # Start the sync process
-                            st.session_state.sync_in_progress = True
-                            st.session_state.sync_progress = {}
-                            st.session_state.current_message = "Authentication successful! Starting sync..."
-                            st.success("👍 Successfully connected to Trakt!")
-                            time.sleep(1)  # Brief pause to show success message
-                            st.rerun()
-                        else:
-                            # Authentication failed or timed out
-                            st.error("🚫 Authentication failed or timed out. Please try again.")
-                            st.session_state.trakt_auth_in_progress = False
-                            st.session_state.auth_polling_started = False
-                            time.sleep(2)  # Show error message for a moment
-                            st.rerun()
+        # Sync progress and Trakt authentication
+        _sync_status_panel()
         
         # Trakt Lists Management
         st.header("Trakt Lists")
 
-        # Display existing lists
-        for i, list_data in enumerate(st.session_state.trakt_lists):
-            with st.expander(f"List: {list_data['collection_name']}", expanded=True):
-                col1, col2, col3, col4, col5 = st.columns([3, 3, 2, 3, 1])
+        # Hashable snapshot of the libraries, so their options are only formatted when they change
+        libs_key = tuple((lib['id'], lib['name'], lib['type']) for lib in st.session_state.emby_libraries)
+        options_by_type = _library_options_by_type(libs_key)
+        
+        # "name (id)" labels mapped back to their library IDs, so selections never need parsing
+        label_to_id = {
+            label: lib_id
+            for options, ids in options_by_type.values()
+            for label, lib_id in zip(options, ids)
+        }
+        
+        # Edits are staged in one table and saved together on submit
+        if st.session_state.trakt_lists:
+            id_to_label = {lib_id: label for label, lib_id in label_to_id.items()}
+            
+            with st.form("lists_edit"):
+                edited_rows = st.data_editor(
+                    [
+                        {
+                            'collection_name': list_data['collection_name'],
+                            'list_id': list_data['list_id'],
+                            'type': list_data['type'],
+                            'library': id_to_label.get(list_data.get('library_id', ''))
+                        }
+                        for list_data in st.session_state.trakt_lists
+                    ],
+                    column_config={
+                        'collection_name': st.column_config.TextColumn("Collection Name", required=True),
+                        'list_id': st.column_config.TextColumn("List ID", required=True),
+                        'type': st.column_config.SelectboxColumn("Type", options=["movies", "shows"], required=True),
+                        'library': st.column_config.SelectboxColumn("Library", options=list(label_to_id))
+                    },
+                    num_rows="dynamic",
+                    hide_index=True,
+                    use_container_width=True,
+                    key=TRAKT_LISTS_EDITOR_KEY
+                )
+                st.caption("To delete a list, select its row and press Delete, then apply.")
                 
-                with col1:
-                    st.write("Collection Name")
-                    new_name = st.text_input("##", list_data['collection_name'], key=f"name_{i}", label_visibility="collapsed")
-                with col2:
-                    st.write("List ID")
-                    new_list_id = st.text_input("##", list_data['list_id'], key=f"id_{i}", label_visibility="collapsed")
-                with col3:
-                    st.write("Type")
-                    new_type = st.selectbox("##", ["movies", "shows"], 
-                                          index=0 if list_data['type'] == "movies" else 1,
-                                          key=f"type_{i}", label_visibility="collapsed")
-                with col4:
-                    st.write("Library")
-                    # Filter libraries by type
-                    filtered_libraries = [lib for lib in st.session_state.emby_libraries 
-                                         if lib['type'] == new_type]
-                    
-                    # Create options list with library name and ID
-                    library_options = [f"{lib['name']} ({lib['id']})" for lib in filtered_libraries]
-                    
-                    # If no libraries available, show message
-                    if not library_options:
-                        st.warning(f"No {new_type} libraries configured. Please add libraries in Settings.")
-                        new_library_id = ""
+                if st.form_submit_button("Apply List Changes", use_container_width=True):
+                    if apply_trakt_list_edits(edited_rows, label_to_id, options_by_type):
+                        st.rerun()
                     else:
-                        # Find current library in options
-                        current_library_id = list_data.get('library_id', '')
-                        selected_index = 0  # Default to first option
-                        
-                        for idx, lib in enumerate(filtered_libraries):
-                            if lib['id'] == current_library_id:
-                                selected_index = idx
-                                break
-                        
-                        library_selection = st.selectbox(
-                            "##",
-                            options=library_options,
-                            index=min(selected_index, len(library_options)-1) if library_options else 0,
-                            key=f"library_select_{i}",
-                            label_visibility="collapsed"
-                        )
-                        
-                        # Extract ID from selection
-                        selected_lib_id = library_selection.split("(")[-1].split(")")[0]
-                        new_library_id = selected_lib_id
-                with col5:
-                    st.write("Action")
-                    st.button("Delete", key=f"delete_{i}", use_container_width=True, on_click=lambda i=i: delete_trakt_list(i))
-                
-                # Update list if values changed
-                if (new_name != list_data['collection_name'] or 
-                    new_list_id != list_data['list_id'] or 
-                    new_type != list_data['type'] or
-                    new_library_id != list_data.get('library_id', '')):
-                    list_data.update({
-                        'collection_name': new_name,
-                        'list_id': new_list_id,
-                        'type': new_type,
-                        'library_id': new_library_id
-                    })
-                    save_trakt_lists()
+                        st.info("No changes to save")
 
         # Add new list
         st.header("Add New List")
@@ -1602,12 +1881,8 @@ else:  # Main page
         # Type selection that will affect library options
         new_type = st.selectbox("Type", ["movies", "shows"], key="new_type")
         
-        # Filter libraries by selected type
-        filtered_libraries = [lib for lib in st.session_state.emby_libraries 
-                             if lib['type'] == new_type]
-        
-        # Create options list with library name and ID
-        library_options = [f"{lib['name']} ({lib['id']})" for lib in filtered_libraries]
+        # Libraries of the selected type as "name (id)" options
+        library_options = options_by_type[new_type][0]
         
         # Library selection
         if not library_options:
@@ -1621,9 +1896,8 @@ else:  # Main page
                 key=f"new_library_select_{new_type}"  # Key depends on type to force refresh
             )
             
-            # Extract ID from selection
-            selected_lib_id = library_selection.split("(")[-1].split(")")[0]
-            new_library_id = selected_lib_id
+            # Map the selection back to its library ID
+            new_library_id = label_to_id[library_selection]
         
         # Add button
         if st.button("Add List", type="primary", use_container_width=True):
@@ -1,8 +1,10 @@
 import os
 import sys
+import atexit
+import hashlib
+import signal
 import time
 import argparse
-import schedule  # Add the missing schedule import
 from datetime import datetime
 from dotenv import load_dotenv
 import pathlib
@@ -10,39 +12,67 @@ import pathlib
 # Determine the script directory and .env file path
 script_dir = pathlib.Path(__file__).parent.absolute()
 env_path = script_dir / '.env'
+pid_path = script_dir / 'console_runner.pid'
 
 # Ensure the script can find the sync module regardless of the working directory
 sys.path.append(str(script_dir))
 
-# Track the last modification time of the .env file
-last_env_mtime = os.path.getmtime(env_path) if os.path.exists(env_path) else 0
+# Cheap stat key (mtime, size) of the .env file, and a hash of its contents
+def env_stat_key():
+    stat = os.stat(env_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def env_hash():
+    with open(env_path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+# Track the last seen state of the .env file
+last_env_key = env_stat_key() if os.path.exists(env_path) else None
+last_env_hash = env_hash() if os.path.exists(env_path) else None
 
 # Function to check for and reload environment variables if changed
 def check_env_changes():
-    global last_env_mtime
+    global last_env_key, last_env_hash
     try:
         if os.path.exists(env_path):
-            current_mtime = os.path.getmtime(env_path)
-            if current_mtime > last_env_mtime:
-                print(f"📝 Detected changes to .env file. Reloading configuration...")
-                load_dotenv(dotenv_path=env_path, override=True)
-                last_env_mtime = current_mtime
-                return True
+            current_key = env_stat_key()
+            if current_key != last_env_key:
+                last_env_key = current_key
+                # Only a real content change is worth a reload, not a touch or chmod
+                current_hash = env_hash()
+                if current_hash != last_env_hash:
+                    print(f"📝 Detected changes to .env file. Reloading configuration...")
+                    load_dotenv(dotenv_path=env_path, override=True)
+                    last_env_hash = current_hash
+                    return True
     except Exception as e:
         print(f"⚠️ Error checking .env file: {e}")
     return False
 
+# Record this process's PID so the web interface can stop exactly this process on quit
+def write_pid_file():
+    try:
+        pid_path.write_text(str(os.getpid()))
+        atexit.register(remove_pid_file)
+        # Turn SIGTERM into a normal exit so the PID file is cleaned up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    except OSError as e:
+        print(f"⚠️ Could not write PID file: {e}")
+
+def remove_pid_file():
+    try:
+        if pid_path.exists() and pid_path.read_text().strip() == str(os.getpid()):
+            pid_path.unlink()
+    except OSError:
+        pass
+
+# How often the .env file is checked for changes, and the shortest sleep between loop passes (seconds)
+ENV_CHECK_INTERVAL = 3600
+MIN_LOOP_SLEEP = 1
+
 # Load environment variables from the correct path
 load_dotenv(dotenv_path=env_path, override=True)
 
-from sync_Trakt_to_emby import (
-    check_required_env_vars,
-    start_scheduler,
-    run_scheduler_forever,
-    start_sync,
-    get_config
-)
-
 def main():
     """Main entry point for the console runner"""
     parser = argparse.ArgumentParser(description="Trakt to Emby Sync Console Runner")
@@ -59,8 +89,8 @@ def main():
     
     args = parser.parse_args()
     
-    # Load environment variables from the correct location
-    load_dotenv(dotenv_path=env_path, override=True)
+    # The sync module is imported only once a mode is chosen, so --help stays fast
+    from sync_Trakt_to_emby import check_required_env_vars, get_config
     
     # Display banner
     print("\n" + "="*50)
@@ -86,10 +116,12 @@ def main():
     # Run in specified mode
     if args.mode == "scheduler":
         print("🕒 Starting scheduler in continuous mode...")
+        write_pid_file()
         # Use modified run_scheduler_forever that checks for env changes
         run_scheduler_with_env_monitoring(interval)
     elif args.mode == "sync_once":
         print("🔄 Running one-time sync...")
+        from sync_Trakt_to_emby import start_sync
         # Check for any config changes before running
         check_env_changes()
         start_sync()
@@ -110,12 +142,20 @@ def run_scheduler_with_env_monitoring(interval):
     # Import these locally to ensure they've been properly loaded
     import schedule
     from sync_Trakt_to_emby import start_scheduler, get_config, get_next_occurrence_date
+    
+    # get_config stats .env on every call (re-reading it only when it changed); the loop already
+    # watches the file, so keep the values and skip those lookups until it changes
+    config_cache = {}
+    def cached_config(key):
+        if key not in config_cache:
+            config_cache[key] = get_config(key)
+        return config_cache[key]
 
     # Start the scheduler with time and day settings
-    sync_time = get_config('SYNC_TIME') or '00:00'
-    sync_day = get_config('SYNC_DAY') or 'Monday'
+    sync_time = cached_config('SYNC_TIME') or '00:00'
+    sync_day = cached_config('SYNC_DAY') or 'Monday'
     try:
-        sync_date = int(get_config('SYNC_DATE') or '1')
+        sync_date = int(cached_config('SYNC_DATE') or '1')
     except ValueError:
         sync_date = 1
         
@@ -125,38 +165,56 @@ def run_scheduler_with_env_monitoring(interval):
         print("📝 Environment file will be checked every hour for changes")
         
         try:
+            # The env check deadline is kept on the monotonic clock so it does not drift
+            next_env_check = time.monotonic()
+            schedule_key = None
+            next_run = None
+            
             # Keep the script running to execute scheduled jobs
             while True:
-                # Check for environment file changes
-                if check_env_changes():
+                # Check for environment file changes once per ENV_CHECK_INTERVAL
+                if time.monotonic() >= next_env_check:
+                    next_env_check += ENV_CHECK_INTERVAL
+                    env_changed = check_env_changes()
+                else:
+                    env_changed = False
+                
+                if env_changed:
                     print("📝 Reloaded configuration from .env file")
+                    config_cache.clear()
                     # Reset scheduler with new settings if needed
-                    new_interval = get_config('SYNC_INTERVAL') or interval
-                    new_time = get_config('SYNC_TIME') or '00:00'
-                    new_day = get_config('SYNC_DAY') or 'Monday'
+                    new_interval = cached_config('SYNC_INTERVAL') or interval
+                    new_time = cached_config('SYNC_TIME') or '00:00'
+                    new_day = cached_config('SYNC_DAY') or 'Monday'
                     try:
-                        new_date = int(get_config('SYNC_DATE') or '1')
+                        new_date = int(cached_config('SYNC_DATE') or '1')
                     except ValueError:
                         new_date = 1
                         
-                    if new_interval != interval or new_time != sync_time or new_day != sync_day or new_date != sync_date:
+                    new_schedule = (new_interval, new_time, new_day, new_date)
+                    if new_schedule != (interval, sync_time, sync_day, sync_date):
                         print(f"🔄 Sync schedule changed. Resetting scheduler...")
                         schedule.clear()
                         start_scheduler(new_interval, new_time)
-                        interval = new_interval
-                        sync_time = new_time
-                        sync_day = new_day
-                        sync_date = new_date
+                        interval, sync_time, sync_day, sync_date = new_schedule
                 
                 schedule.run_pending()
-                next_run = get_next_occurrence_date(interval, sync_time, sync_day, sync_date)
-                if next_run:
-                    print(f"⏳ Next sync scheduled for: {next_run}")
-                else:
-                    print("⚠️ No scheduled jobs found. Check your scheduler setup.")
+                # Work out (and report) the next run only when the schedule changes or the last one has passed
+                current_key = (interval, sync_time, sync_day, sync_date)
+                if current_key != schedule_key or (next_run and datetime.now() >= next_run):
+                    schedule_key = current_key
+                    next_run = get_next_occurrence_date(*current_key)
+                    if next_run:
+                        print(f"⏳ Next sync scheduled for: {next_run}")
+                    else:
+                        print("⚠️ No scheduled jobs found. Check your scheduler setup.")
                 
-                # Sleep for a minute
-                time.sleep(3600)  # Check every minute
+                # Sleep until the next job is due or the next env check, whichever comes first
+                idle_seconds = schedule.idle_seconds()
+                sleep_for = next_env_check - time.monotonic()
+                if idle_seconds is not None:
+                    sleep_for = min(sleep_for, idle_seconds)
+                time.sleep(max(MIN_LOOP_SLEEP, sleep_for))
         except KeyboardInterrupt:
             print("\n🛑 Scheduler stopped by user")
         except Exception as e:
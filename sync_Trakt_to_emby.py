@@ -1,43 +1,252 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import gzip
+import hashlib
+import heapq
 import time
 import schedule
 import json
 import os
-from dotenv import load_dotenv
+from dotenv import find_dotenv, load_dotenv
+from collections import Counter, OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
 import re
+import threading
 import streamlit as st
 from datetime import datetime, timedelta
 
+try:
+    import orjson  # Optional: much faster JSON for the large item/mapping files and library pages
+except ImportError:
+    orjson = None
+
+# Shared read-only default for `d.get(key) or _EMPTY_DICT`, so a missing key doesn't allocate a dict.
+# Never store it or mutate it.
+_EMPTY_DICT = {}
+
 # Add these global variables near the top of the file with other global variables
-_library_cache = {}
+_library_cache = OrderedDict()  # LRU order, oldest first
+_library_cache_times = {}  # When each _library_cache entry was fetched
+_library_index = {}  # Provider-ID lookups built alongside _library_cache, same keys
 _missing_items = []
 _ignored_items = []  # New global variable for ignored items
 _emby_id_mapping = {}
 _verbose_logging = False  # Control the verbosity of logging
 
+# Keep-alive sessions for Trakt and Emby calls. Idempotent requests are retried with backoff
+# on rate limiting and transient server errors. POSTs are retried only on 429, where the server
+# did not act on the request; any other retry of a collection or token request is not safe.
+# Every call gets a (connect, read) timeout.
+HTTP_TIMEOUT = (5, 30)
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies HTTP_TIMEOUT unless a call passes its own"""
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', HTTP_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+class RateLimitRetry(Retry):
+    """Retry that also retries POSTs, but only on 429 where the server did not act on the request"""
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == 'POST' and status_code == 429:
+            method = 'GET'
+        return super().is_retry(method, status_code, has_retry_after)
+
+def make_http_session(pool_maxsize):
+    """Create a pooled, retrying session"""
+    session = TimeoutSession()
+    # Retry-After is honoured on 429/503; once retries run out the last response is returned
+    # so callers still see and report the status code
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=pool_maxsize,
+        max_retries=RateLimitRetry(total=5, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                                   respect_retry_after_header=True, raise_on_status=False)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+_trakt_session = make_http_session(10)
+_emby_session = make_http_session(20)
+
+# Large Emby libraries are fetched in pages of this size, several pages at a time
+EMBY_PAGE_SIZE = 1000
+EMBY_PAGE_WORKERS = 8
+
+def is_overloaded(response):
+    """Whether a response says the server is rate limiting us or struggling"""
+    return response.status_code == 429 or response.status_code >= 500
+
+class AdaptiveLimit:
+    """Concurrency limit that creeps up while requests are fast and succeed, and halves on overload (AIMD)"""
+    def __init__(self, max_limit, min_limit=1, increase=0.5, decrease=0.5, target_latency=0.5):
+        self.limit = float(max_limit)
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def call(self, send, overloaded=is_overloaded):
+        """Run send() once a slot is free, then adjust the limit from its latency and result"""
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+        started = time.monotonic()
+        failed = True
+        try:
+            result = send()
+            failed = overloaded(result)
+            return result
+        finally:
+            latency = time.monotonic() - started
+            with self._condition:
+                self._in_flight -= 1
+                if failed:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                elif latency <= self.target_latency:
+                    self.limit = min(self.max_limit, self.limit + self.increase)
+                self._condition.notify_all()
+
+# Shared by the concurrent Emby page fetches and collection adds, so a throttling server
+# slows all of them down and the limit is remembered between syncs
+_emby_limit = AdaptiveLimit(EMBY_PAGE_WORKERS)
+
+# Lists can be synced in parallel: cap concurrent Trakt list fetches and serialize missing-item updates
+_trakt_api_semaphore = threading.Semaphore(2)
+_missing_items_lock = threading.Lock()
+
+# Emby ID mappings are written in batches: adds only mark them dirty, and the file is
+# rewritten at most once per EMBY_ID_MAPPING_FLUSH_INTERVAL seconds (or when forced)
+EMBY_ID_MAPPING_FLUSH_INTERVAL = 5
+_emby_id_mapping_dirty = False
+_emby_id_mapping_last_flush = 0.0
+_emby_id_mapping_flush_lock = threading.Lock()
+_mapping_lock = threading.RLock()  # Guards _emby_id_mapping while it is changed or serialized
+
+# Bounds for the in-memory caches. Library fetches go stale after LIBRARY_CACHE_TTL seconds and only
+# the most recently used LIBRARY_CACHE_MAX_ENTRIES libraries are kept. Mappings beyond
+# EMBY_ID_MAPPING_MAX_ENTRIES are dropped oldest-updated first; they are re-derived by provider-ID matching.
+LIBRARY_CACHE_MAX_ENTRIES = 16
+LIBRARY_CACHE_TTL = 900
+# Library snapshots are also kept on disk for LIBRARY_CACHE_TTL, so a fresh process can skip the fetch.
+# Each library has its own file, LIBRARY_DISK_CACHE_PREFIX + a hash of the server, library and item type
+LIBRARY_DISK_CACHE_PREFIX = 'emby_library_cache'
+LIBRARY_DISK_CACHE_SUFFIX = '.json.gz'
+EMBY_ID_MAPPING_MAX_ENTRIES = 50000
+_library_cache_lock = threading.RLock()  # Libraries are fetched from several threads at once
+
+# JSON helpers that use orjson when it is installed and fall back to the json module
+def dumps_json(obj):
+    """Encode obj as indented JSON bytes"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+# Digest and mtime of the last payload written to each file, so an unchanged save is skipped
+_last_written = {}
+
+def write_json_bytes(data, path):
+    """Atomically write encoded JSON to path, unless the file still holds exactly this payload"""
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    last = _last_written.get(path)
+    if last and last == (digest, _file_mtime(path)):
+        return False
+    # Write a temporary file first so a crash never leaves a truncated file behind
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _last_written[path] = (digest, _file_mtime(path))
+    return True
+
+def dumps_json_line(obj):
+    """Encode obj as one compact line of newline-delimited JSON"""
+    if orjson:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj).encode() + b'\n'
+
+def dump_json_file(obj, path):
+    """Write obj to path as indented JSON, returning False if the file already held it"""
+    return write_json_bytes(dumps_json(obj), path)
+
+def load_json_file(path):
+    """Read JSON from path"""
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def response_json(response):
+    """Decode a JSON response body"""
+    return orjson.loads(response.content) if orjson else response.json()
+
+# Timestamps written on items and mappings only need one-second resolution, so the
+# formatted string is reused until the second changes
+_cached_now = (0, '')
+
+def now_iso():
+    """Current local time as an ISO string, to the second"""
+    global _cached_now
+    second = int(time.time())
+    cached = _cached_now
+    if cached[0] != second:
+        cached = _cached_now = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
 # Functions to manage Emby ID mappings
 def save_emby_id_mappings():
     """Save Emby ID mappings to a JSON file"""
     global _emby_id_mapping
     try:
-        # Create a copy of the dictionary to avoid modification during serialization
-        mapping_copy = dict(_emby_id_mapping)
-        with open('emby_id_mappings.json', 'w') as f:
-            json.dump(mapping_copy, f, indent=2)
-        print(f"Saved {len(mapping_copy)} Emby ID mappings to file")
+        # Serialize under the lock instead of copying the dict; the file is written after releasing it
+        with _mapping_lock:
+            data = dumps_json(_emby_id_mapping)
+            count = len(_emby_id_mapping)
+        write_json_bytes(data, 'emby_id_mappings.json')
+        log_debug(f"Saved {count} Emby ID mappings to file")
         return True
     except Exception as e:
         print(f"Error saving Emby ID mappings: {e}")
         return False
 
+def flush_emby_id_mappings(force=False):
+    """Save Emby ID mappings if they changed, at most once per flush interval unless forced"""
+    global _emby_id_mapping_dirty, _emby_id_mapping_last_flush
+    with _emby_id_mapping_flush_lock:
+        if not _emby_id_mapping_dirty:
+            return True
+        if not force and time.monotonic() - _emby_id_mapping_last_flush < EMBY_ID_MAPPING_FLUSH_INTERVAL:
+            return True
+        _emby_id_mapping_dirty = False
+        _emby_id_mapping_last_flush = time.monotonic()
+        if save_emby_id_mappings():
+            return True
+        _emby_id_mapping_dirty = True  # Try again on the next flush
+        return False
+
+# Don't lose mappings that are still waiting for a batched write
+atexit.register(flush_emby_id_mappings, True)
+
 def load_emby_id_mappings():
     """Load Emby ID mappings from JSON file"""
     global _emby_id_mapping
     try:
         if os.path.exists('emby_id_mappings.json'):
-            with open('emby_id_mappings.json', 'r') as f:
-                _emby_id_mapping = json.load(f)
+            with _mapping_lock:
+                _emby_id_mapping = load_json_file('emby_id_mappings.json')
+                trim_emby_id_mappings()
             print(f"Loaded {len(_emby_id_mapping)} Emby ID mappings from file")
         else:
             _emby_id_mapping = {}
@@ -48,78 +257,176 @@ def load_emby_id_mappings():
         _emby_id_mapping = {}
         return {}
 
+def trim_emby_id_mappings():
+    """Drop the least recently updated mappings beyond EMBY_ID_MAPPING_MAX_ENTRIES"""
+    excess = len(_emby_id_mapping) - EMBY_ID_MAPPING_MAX_ENTRIES
+    if excess > 0:
+        # Dicts keep insertion order and updates are re-inserted at the end, so the oldest come first
+        for key in list(_emby_id_mapping)[:excess]:
+            _emby_id_mapping.pop(key, None)
+        print(f"Dropped {excess} old Emby ID mappings")
+
 def add_emby_id_mapping(trakt_id, emby_id, item_type, title):
     """Store a mapping between Trakt ID and Emby ID"""
-    global _emby_id_mapping
+    global _emby_id_mapping, _emby_id_mapping_dirty
     mapping_key = f"{item_type}_{trakt_id}"
     
-    # Create or update the mapping
-    _emby_id_mapping[mapping_key] = {
-        "emby_id": emby_id,
-        "type": item_type,
-        "title": title,
-        "last_updated": datetime.now().isoformat()
-    }
+    # Create or update the mapping, moving it to the newest end
+    with _mapping_lock:
+        _emby_id_mapping.pop(mapping_key, None)
+        _emby_id_mapping[mapping_key] = {
+            "emby_id": emby_id,
+            "type": item_type,
+            "title": title,
+            "last_updated": now_iso()
+        }
+        trim_emby_id_mappings()
     
-    # Save to file after each update (can be optimized later if needed)
+    # Saved in batches rather than rewriting the whole file for every mapping
+    _emby_id_mapping_dirty = True
     try:
-        save_emby_id_mappings()
-        log_debug(f" Saved mapping for {title}")
+        flush_emby_id_mappings()
+        log_debug(f" Stored mapping for {title}")
     except Exception as e:
         log_error(f" Error saving ID mapping: {str(e)}")
     return True
 
 def get_emby_id_from_mapping(item_type, trakt_id):
     """Get Emby ID from mapping if it exists"""
-    global _emby_id_mapping
-    key = f"{item_type}_{trakt_id}"
-    mapping = _emby_id_mapping.get(key)
-    if mapping:
-        return mapping.get("emby_id")
-    return None
-
+    mapping = _emby_id_mapping.get(f"{item_type}_{trakt_id}")
+    return mapping.get("emby_id") if mapping else None
+
+# Emby item URL patterns:
+# 1. /item?id=XXX format (also emby.dll?id=XXX, or id= after other query parameters)
+# 2. /item/XXX format
+# 3. /Details/XXX format
+# 4. /web/index.html#!/item?id=XXX format
+# 5. /web/index.html#!/Details/XXX format
+_EMBY_ID_RE = re.compile(r'(?:[?&]id=|item/|Details/)([^&\s/#]+)')
+
+@lru_cache(maxsize=4096)  # URLs map to fixed IDs, so results never go stale
 def extract_emby_id_from_url(url):
     """Extract Emby item ID from a URL"""
-    if not url or "id=" not in url:
+    match = _EMBY_ID_RE.search(url or '')
+    if not match:
         return None
-    
+    emby_id = match.group(1)
+    log_debug(f"Extracted Emby ID from URL: {emby_id}")
+    return emby_id
+
+# Modification times of the item files as of the last load or save, so the
+# in-memory lists are only re-read when another process has written the file
+_items_file_mtimes = {}
+
+def _file_mtime(path):
+    """Return the modification time of a file, or None if it does not exist"""
     try:
-        # Extract ID from URL 
-        url_parts = url.split("id=")
-        if len(url_parts) > 1:
-            id_part = url_parts[1]
-            if "&" in id_part:
-                emby_id = id_part.split("&")[0]
-            else:
-                emby_id = id_part
-            print(f"Extracted Emby ID from URL: {emby_id}")
-            return emby_id
-    except Exception as e:
-        print(f"Could not extract ID from URL: {e}")
-    
-    return None
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+# Bulk operations suspend the item saves; each suspended save is recorded here and
+# written once when the outermost suspend_saves() block exits
+_save_suspended = 0
+_pending_saves = set()
+_save_suspend_lock = threading.Lock()
+
+@contextmanager
+def suspend_saves():
+    """Defer missing/ignored item saves inside the block and write each changed file once at the end"""
+    global _save_suspended
+    with _save_suspend_lock:
+        _save_suspended += 1
+    try:
+        yield
+    finally:
+        pending = set()
+        with _save_suspend_lock:
+            _save_suspended -= 1
+            if not _save_suspended:
+                pending.update(_pending_saves)
+                _pending_saves.clear()
+        if 'missing' in pending:
+            save_missing_items()
+        if 'ignored' in pending:
+            save_ignored_items()
+
+# Missing items are stored as newline-delimited JSON, one item per line, so a newly missing
+# item is appended as a single line instead of rewriting the whole file. Every full save
+# compacts the file. The older single-document missing_items.json is read only until the
+# first save.
+MISSING_ITEMS_FILE = 'missing_items.ndjson'
+LEGACY_MISSING_ITEMS_FILE = 'missing_items.json'
 
 # Functions to manage missing items
 def save_missing_items():
-    """Save missing items to a JSON file"""
+    """Save missing items to the NDJSON file, rewriting and compacting it"""
     global _missing_items
+    if _save_suspended:
+        _pending_saves.add('missing')
+        return True
+    try:
+        write_json_bytes(b''.join(dumps_json_line(item) for item in _missing_items), MISSING_ITEMS_FILE)
+        _items_file_mtimes[MISSING_ITEMS_FILE] = _file_mtime(MISSING_ITEMS_FILE)
+        log_debug(f"Saved {len(_missing_items)} missing items to file")
+        retire_legacy_missing_items_file()
+        return True
+    except Exception as e:
+        print(f"Error saving missing items: {e}")
+        return False
+
+def retire_legacy_missing_items_file():
+    """Move the old JSON missing items file aside once the NDJSON file holds its items"""
+    # Left in place it would go stale, and load_missing_items would revive it if the NDJSON file went missing
+    if not os.path.exists(LEGACY_MISSING_ITEMS_FILE):
+        return
+    try:
+        os.replace(LEGACY_MISSING_ITEMS_FILE, f"{LEGACY_MISSING_ITEMS_FILE}.bak")
+        print(f"Migrated missing items to {MISSING_ITEMS_FILE}; kept the old file as {LEGACY_MISSING_ITEMS_FILE}.bak")
+    except OSError as e:
+        print(f"Error retiring {LEGACY_MISSING_ITEMS_FILE}: {e}")
+
+def append_missing_item(item):
+    """Append one new missing item to the NDJSON file, falling back to a full save when needed"""
+    if _save_suspended or not os.path.exists(MISSING_ITEMS_FILE):
+        return save_missing_items()
     try:
-        with open('missing_items.json', 'w') as f:
-            json.dump(_missing_items, f, indent=2)
-        print(f"Saved {len(_missing_items)} missing items to file")
+        in_sync = _file_mtime(MISSING_ITEMS_FILE) == _items_file_mtimes.get(MISSING_ITEMS_FILE)
+        with open(MISSING_ITEMS_FILE, 'ab') as f:
+            f.write(dumps_json_line(item))
+        _last_written.pop(MISSING_ITEMS_FILE, None)
+        # If another process wrote the file since our last load, leave the stale mtime so it is reloaded
+        if in_sync:
+            _items_file_mtimes[MISSING_ITEMS_FILE] = _file_mtime(MISSING_ITEMS_FILE)
+        log_debug(f"Appended {item.get('title')} to missing items file")
         return True
     except Exception as e:
         print(f"Error saving missing items: {e}")
         return False
 
+def read_missing_items_file():
+    """Read missing items from the NDJSON file; a repeated item key means a newer copy of that item"""
+    loads = orjson.loads if orjson else json.loads
+    items_by_key = {}
+    with open(MISSING_ITEMS_FILE, 'rb') as f:
+        for line in f:
+            if line.strip():
+                item = loads(line)
+                items_by_key[missing_item_key(item)] = item
+    return list(items_by_key.values())
+
 def load_missing_items():
-    """Load missing items from JSON file"""
+    """Load missing items from the NDJSON file, or from the legacy JSON file before the first save"""
     global _missing_items
     try:
-        if os.path.exists('missing_items.json'):
-            with open('missing_items.json', 'r') as f:
-                _missing_items = json.load(f)
+        if os.path.exists(MISSING_ITEMS_FILE):
+            _missing_items = read_missing_items_file()
+            _items_file_mtimes[MISSING_ITEMS_FILE] = _file_mtime(MISSING_ITEMS_FILE)
             print(f"Loaded {len(_missing_items)} missing items from file")
+        elif os.path.exists(LEGACY_MISSING_ITEMS_FILE):
+            _missing_items = load_json_file(LEGACY_MISSING_ITEMS_FILE)
+            _items_file_mtimes[MISSING_ITEMS_FILE] = None
+            print(f"Loaded {len(_missing_items)} missing items from {LEGACY_MISSING_ITEMS_FILE}")
         else:
             _missing_items = []
             print("No missing items file found, starting with empty list")
@@ -139,16 +446,23 @@ def clear_missing_items_for_collection(collection_name):
 def get_missing_items():
     """Get the list of missing items"""
     global _missing_items
+    # Pick up changes written by another process (e.g. the console runner)
+    with _missing_items_lock:
+        if _file_mtime(MISSING_ITEMS_FILE) != _items_file_mtimes.get(MISSING_ITEMS_FILE):
+            load_missing_items()
     return _missing_items
 
 # Functions to manage ignored items
 def save_ignored_items():
     """Save ignored items to a JSON file"""
     global _ignored_items
+    if _save_suspended:
+        _pending_saves.add('ignored')
+        return True
     try:
-        with open('ignored_items.json', 'w') as f:
-            json.dump(_ignored_items, f, indent=2)
-        print(f"Saved {len(_ignored_items)} ignored items to file")
+        dump_json_file(_ignored_items, 'ignored_items.json')
+        _items_file_mtimes['ignored_items.json'] = _file_mtime('ignored_items.json')
+        log_debug(f"Saved {len(_ignored_items)} ignored items to file")
         return True
     except Exception as e:
         print(f"Error saving ignored items: {e}")
@@ -159,8 +473,8 @@ def load_ignored_items():
     global _ignored_items
     try:
         if os.path.exists('ignored_items.json'):
-            with open('ignored_items.json', 'r') as f:
-                _ignored_items = json.load(f)
+            _ignored_items = load_json_file('ignored_items.json')
+            _items_file_mtimes['ignored_items.json'] = _file_mtime('ignored_items.json')
             print(f"Loaded {len(_ignored_items)} ignored items from file")
         else:
             _ignored_items = []
@@ -174,123 +488,111 @@ def load_ignored_items():
 def get_ignored_items():
     """Get the list of ignored items"""
     global _ignored_items
+    # Pick up changes written by another process (e.g. the console runner)
+    if _file_mtime('ignored_items.json') != _items_file_mtimes.get('ignored_items.json'):
+        load_ignored_items()
     return _ignored_items
 
-def ignore_missing_item(item_index):
+def missing_item_key(item):
+    """Stable key for a missing or ignored item: its Trakt ID, or type/title/year when it has none"""
+    trakt_id = (item.get('ids') or item.get('trakt_ids') or _EMPTY_DICT).get('trakt')
+    if trakt_id:
+        return str(trakt_id)
+    return f"{item.get('type', '')}:{item.get('title', '')}:{item.get('year', '')}"
+
+def find_item(items, key):
+    """Return the first item in a list with the given key, or None"""
+    return next((item for item in items if missing_item_key(item) == key), None)
+
+def take_items(items, keys):
+    """Remove the items with the given keys from a list in a single pass and return them"""
+    keys = set(keys)
+    kept, taken = [], []
+    for item in items:
+        (taken if missing_item_key(item) in keys else kept).append(item)
+    items[:] = kept
+    _items_changed()
+    return taken
+
+def ignore_missing_item(key):
     """Move an item from missing items to ignored items"""
-    global _missing_items, _ignored_items
-    
-    if item_index < 0 or item_index >= len(_missing_items):
-        return False, "Invalid item index"
-    
-    # Get the item to ignore
-    item = _missing_items[item_index]
-    
-    # Add timestamp when it was ignored
-    item['ignored_on'] = datetime.now().isoformat()
-    
-    # Add to ignored items
-    _ignored_items.append(item)
-    
-    # Remove from missing items
-    del _missing_items[item_index]
-    
-    # Save both lists
-    save_missing_items()
-    save_ignored_items()
-    
-    return True, f"Ignored item: {item.get('title')}"
+    return ignore_missing_items([key])
 
-def unignore_item(item_index):
+def unignore_item(key):
     """Move an item from ignored items back to missing items"""
     global _missing_items, _ignored_items
     
-    if item_index < 0 or item_index >= len(_ignored_items):
-        return False, "Invalid item index"
-    
-    # Get the item to unignore
-    item = _ignored_items[item_index]
-    
-    # Remove ignored_date if it exists
-    if 'ignored_on' in item:
-        del item['ignored_on']
-    
-    # Update last_checked date
-    item['last_checked'] = datetime.now().isoformat()
-    
-    # Add to missing items
-    _missing_items.append(item)
-    
-    # Remove from ignored items
-    del _ignored_items[item_index]
-    
-    # Save both lists
-    save_missing_items()
-    save_ignored_items()
+    with _missing_items_lock:
+        taken = take_items(_ignored_items, [key])
+        if not taken:
+            return False, "Item is no longer ignored"
+        
+        now = now_iso()
+        for item in taken:
+            # Remove ignored_date if it exists
+            item.pop('ignored_on', None)
+            # Update last_checked date
+            item['last_checked'] = now
+            # Add to missing items
+            _missing_items.append(item)
+        _items_changed()
+        
+        # Save both lists
+        save_missing_items()
+        save_ignored_items()
     
-    return True, f"Unignored item: {item.get('title')}"
+    return True, f"Unignored item: {taken[0].get('title')}"
 
-def ignore_missing_items(item_indices):
+def ignore_missing_items(keys):
     """Move multiple items from missing items to ignored items"""
     global _missing_items, _ignored_items
     
-    if not item_indices or not isinstance(item_indices, list):
+    if not keys:
         return False, "No valid items selected"
     
-    # Sort indices in descending order to avoid index shifting when removing items
-    sorted_indices = sorted(item_indices, reverse=True)
-    
-    success_count = 0
-    failed_count = 0
-    ignored_titles = []
-    
-    for index in sorted_indices:
-        if index < 0 or index >= len(_missing_items):
-            failed_count += 1
-            continue
-        
-        # Get the item to ignore
-        item = _missing_items[index]
-        title = item.get('title', 'Unknown')
+    with _missing_items_lock:
+        # Items are referenced by key, so a rerun that reorders the list cannot hit the wrong item
+        taken = take_items(_missing_items, keys)
         
-        # Add timestamp when it was ignored
-        item['ignored_on'] = datetime.now().isoformat()
+        now = now_iso()
+        for item in taken:
+            # Add timestamp when it was ignored
+            item['ignored_on'] = now
+            # Add to ignored items
+            _ignored_items.append(item)
+        _items_changed()
         
-        # Add to ignored items
-        _ignored_items.append(item)
-        
-        # Remove from missing items
-        del _missing_items[index]
-        
-        success_count += 1
-        ignored_titles.append(title)
-    
-    # Save both lists
-    save_missing_items()
-    save_ignored_items()
+        # Save both lists
+        if taken:
+            save_missing_items()
+            save_ignored_items()
     
-    if success_count > 0:
+    ignored_titles = [item.get('title', 'Unknown') for item in taken]
+    if len(ignored_titles) == 1:
+        return True, f"Ignored item: {ignored_titles[0]}"
+    if ignored_titles:
         titles_str = ", ".join(ignored_titles[:5])
         if len(ignored_titles) > 5:
             titles_str += f" and {len(ignored_titles) - 5} more"
-        return True, f"Ignored {success_count} items: {titles_str}"
+        return True, f"Ignored {len(ignored_titles)} items: {titles_str}"
     else:
         return False, "No valid items were ignored"
 
-def recheck_missing_item(item_index, manual_emby_id=None):
+def recheck_missing_item(key, manual_emby_id=None):
     """Recheck a specific missing item to see if it can now be found in Emby"""
     global _missing_items
     
-    if item_index < 0 or item_index >= len(_missing_items):
-        return False, "Invalid item index"
+    with _missing_items_lock:
+        item = find_item(_missing_items, key)
+    if item is None:
+        return False, "Item is no longer missing"
     
-    item = _missing_items[item_index]
     title = item.get('title', '')
     year = item.get('year')
     item_type = item.get('type', '')
     library_id = item.get('library_id', '')
     collection_name = item.get('collection_name', '')
-    trakt_ids = item.get('trakt_ids', {})
+    trakt_ids = item.get('trakt_ids') or _EMPTY_DICT
     
     # Support both old and new format for collections
     collections = item.get('collections', [])
@@ -305,35 +607,22 @@ def recheck_missing_item(item_index, manual_emby_id=None):
         log_info(f" Using manually provided Emby ID: {manual_emby_id}")
         
         # Check if we can actually get the item from Emby
-        server_url = get_EMBY_SERVER().rstrip('/')
-        headers = {'X-Emby-Token': get_EMBY_API_KEY()}
+        server_url, headers = emby_connection()
         try:
-            response = requests.get(f"{server_url}/Items/{manual_emby_id}", headers=headers)
+            response = _emby_session.get(f"{server_url}/Items/{manual_emby_id}", headers=headers)
             if response.status_code == 200:
                 # Store mapping if we have a Trakt ID
                 if trakt_ids.get('trakt'):
                     add_emby_id_mapping(trakt_ids['trakt'], manual_emby_id, item_type, title)
                 
                 # Process for each collection
-                success_count = 0
-                for collection_info in collections:
-                    coll_name = collection_info.get('name', '')
-                    coll_library_id = collection_info.get('library_id', '')
-                    
-                    # Find or create collection
-                    collection_id = find_collection_by_name(coll_name)
-                    if collection_id:
-                        # Add item to collection
-                        if add_movie_to_emby_collection(manual_emby_id, collection_id):
-                            log_info(f" Added {title} to collection {coll_name}")
-                            success_count += 1
-                    else:
-                        log_info(f" Collection {coll_name} not found")
+                success_count = add_item_to_collections(manual_emby_id, title, collections)
                 
                 # Remove from missing items if added to at least one collection
                 if success_count > 0:
-                    del _missing_items[item_index]
-                    save_missing_items()
+                    with _missing_items_lock:
+                        take_items(_missing_items, [key])
+                        save_missing_items()
                     return True, f"Added {title} to {success_count} collections"
                 else:
                     return False, "Found in Emby but could not add to any collections"
@@ -352,43 +641,222 @@ def recheck_missing_item(item_index, manual_emby_id=None):
         log_info(f" Found in Emby: {title} - ID: {emby_id}")
         
         # Process for each collection
-        success_count = 0
-        for collection_info in collections:
-            coll_name = collection_info.get('name', '')
-            
-            # Find or create collection
-            collection_id = find_collection_by_name(coll_name)
-            if collection_id:
-                # Add item to collection
-                if add_movie_to_emby_collection(emby_id, collection_id):
-                    log_info(f" Added {title} to collection {coll_name}")
-                    success_count += 1
-            else:
-                log_info(f" Collection {coll_name} not found")
+        success_count = add_item_to_collections(emby_id, title, collections)
         
         # Remove from missing items if added to at least one collection
         if success_count > 0:
-            del _missing_items[item_index]
-            save_missing_items()
+            with _missing_items_lock:
+                take_items(_missing_items, [key])
+                save_missing_items()
             return True, f"Added {title} to {success_count} collections"
         else:
-            _missing_items[item_index]['reason'] = "Found in Emby but collection doesn't exist"
+            item['reason'] = "Found in Emby but collection doesn't exist"
             save_missing_items()
             return False, f"Found {title} but could not add to any collections"
     else:
         # Still missing
         log_info(f" Still cannot find {'movie' if item_type == 'movie' else 'TV show'}: {title}")
         # Update last checked time
-        _missing_items[item_index]['last_checked'] = datetime.now().isoformat()
+        item['last_checked'] = now_iso()
         save_missing_items()
         return False, f"Could not find {title} in Emby library"
 
+# Upper bound on concurrent Emby requests while rechecking missing items
+RECHECK_MAX_WORKERS = 8
+
+# Items are added to a collection at most this many IDs per request, keeping URLs short
+COLLECTION_ADD_BATCH_SIZE = 50
+
+# {lowercase name: id} of all Emby collections and when it was fetched; kept for LIBRARY_CACHE_TTL.
+# During sync_all_trakt_lists the index is fetched once up front and kept current through
+# remember_collection, so a name missing from it is known not to exist and is not refetched.
+_collections_index = {}
+_collections_index_time = 0.0
+_collections_index_complete = False
+
+def get_all_collections_index(force_refresh=False):
+    """Return all Emby collections as a {lowercase name: id} mapping, fetched in one request and cached"""
+    global _collections_index, _collections_index_time
+    if not force_refresh and time.time() - _collections_index_time <= LIBRARY_CACHE_TTL:
+        return _collections_index
+    
+    server_url, headers = emby_connection()
+    # Name and Id are always returned; no extra Fields, images or user data are needed for the index
+    params = {
+        "IncludeItemTypes": "BoxSet",
+        "Recursive": "true",
+        "EnableImages": "false",
+        "EnableImageTypes": "",
+        "EnableUserData": "false"
+    }
+    
+    try:
+        response = _emby_session.get(f'{server_url}/Items', headers=headers, params=params)
+        if response.status_code == 200:
+            index = {}
+            for item in response_json(response).get('Items', []):
+                index.setdefault((item.get('Name') or '').lower(), item.get('Id'))  # First match wins
+            _collections_index, _collections_index_time = index, time.time()
+            return index
+        print(f"Error searching for collections: HTTP {response.status_code}")
+        print(f"Response: {response.text}")
+    except Exception as e:
+        print(f"Error finding collections: {e}")
+    return _collections_index
+
+def remember_collection(collection_name, collection_id):
+    """Record a newly created collection in the collections index"""
+    if collection_id:
+        _collections_index[collection_name.lower()] = collection_id
+
+def add_item_to_collections(emby_id, title, collections):
+    """Add one Emby item to each of its collections concurrently, returning how many succeeded"""
+    if not collections:
+        return 0
+    def add_to_collection(collection_info):
+        coll_name = collection_info.get('name', '')
+        collection_id = find_collection_by_name(coll_name)
+        if not collection_id:
+            log_info(f" Collection {coll_name} not found")
+            return False
+        if add_movie_to_emby_collection(emby_id, collection_id):
+            log_info(f" Added {title} to collection {coll_name}")
+            return True
+        return False
+    
+    with ThreadPoolExecutor(max_workers=min(RECHECK_MAX_WORKERS, len(collections))) as executor:
+        return sum(executor.map(add_to_collection, collections))
+
+def recheck_missing_items_bulk(keys):
+    """Recheck several missing items at once, returning (title, success, message) per item"""
+    global _missing_items
+    
+    with _missing_items_lock:
+        by_key = {}
+        for item in _missing_items:
+            by_key.setdefault(missing_item_key(item), item)
+    keys = [key for key in dict.fromkeys(keys) if key in by_key]
+    if not keys:
+        return []
+    
+    def item_collections(item):
+        # Support both old and new format for collections
+        collections = item.get('collections', [])
+        if not collections and item.get('collection_name'):
+            collections = [{'name': item['collection_name'], 'library_id': item.get('library_id', '')}]
+        return collections
+    
+    def item_library_id(item):
+        collections = item_collections(item)
+        return item.get('library_id') or (collections[0].get('library_id') if collections else '')
+    
+    # Refresh every library involved once so newly added content can be found
+    libraries = {("Movie" if by_key[key].get('type') == 'movie' else "Series", item_library_id(by_key[key]))
+                 for key in keys}
+    with ThreadPoolExecutor(max_workers=min(RECHECK_MAX_WORKERS, len(libraries))) as executor:
+        list(executor.map(lambda library: get_emby_library_items(*library, force_refresh=True), libraries))
+    
+    # Match every item locally against the cached library data
+    found = {}
+    for key in keys:
+        item = by_key[key]
+        provider_ids = item.get('ids') or item.get('trakt_ids') or _EMPTY_DICT
+        if item.get('type') == 'movie':
+            emby_id = search_movie_in_emby(item.get('title', ''), item.get('year'), provider_ids, item_library_id(item))
+        else:
+            emby_id = search_tv_show_in_emby(item.get('title', ''), item.get('year'), provider_ids, item_library_id(item))
+        if emby_id:
+            found[key] = emby_id
+    
+    # Group the found items per collection and add each group in batches of COLLECTION_ADD_BATCH_SIZE
+    per_collection = {}
+    for key, emby_id in found.items():
+        for collection_info in item_collections(by_key[key]):
+            per_collection.setdefault(collection_info.get('name', ''), []).append((key, emby_id))
+    batches = [(coll_name, entries[start:start + COLLECTION_ADD_BATCH_SIZE])
+               for coll_name, entries in per_collection.items()
+               for start in range(0, len(entries), COLLECTION_ADD_BATCH_SIZE)]
+    
+    def add_to_collection(coll_name, entries):
+        collection_id = find_collection_by_name(coll_name)
+        if not collection_id:
+            log_info(f" Collection {coll_name} not found")
+            return False
+        return add_movie_to_emby_collection(','.join(emby_id for _, emby_id in entries), collection_id)
+    
+    # The batch requests are independent, so send them concurrently
+    added = {}
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(RECHECK_MAX_WORKERS, len(batches))) as executor:
+            futures = {executor.submit(add_to_collection, coll_name, entries): entries
+                       for coll_name, entries in batches}
+            for future in as_completed(futures):
+                if future.result():
+                    for key, _ in futures[future]:
+                        added[key] = added.get(key, 0) + 1
+    
+    results = []
+    now = now_iso()
+    for key in keys:
+        item = by_key[key]
+        title = item.get('title', '')
+        if added.get(key):
+            results.append((title, True, f"Added {title} to {added[key]} collections"))
+        elif key in found:
+            item['reason'] = "Found in Emby but collection doesn't exist"
+            results.append((title, False, f"Found {title} but could not add to any collections"))
+        else:
+            item['last_checked'] = now
+            results.append((title, False, f"Could not find {title} in Emby library"))
+    
+    # Drop the items that were added and save once
+    with _missing_items_lock:
+        take_items(_missing_items, added)
+        save_missing_items()
+    flush_emby_id_mappings(force=True)
+    return results
+
+# {trakt_id: item} indexes of the missing and ignored lists, each stored with the (id, len,
+# generation) of the list it was built from. Reloads replace the list, and the in-place
+# mutators (take_items, ignore/unignore) bump the generation, so a stale index is always
+# detected, even when an add and a remove leave a list at the same length.
+# _trakt_index_append keeps an index current through the sync's appends without a rebuild.
+_trakt_indexes = {}
+_items_generation = 0
+
+def _items_changed():
+    """Mark the trakt ID indexes of the missing and ignored lists as stale"""
+    global _items_generation
+    _items_generation += 1
+
+def _trakt_index(name, items):
+    """Return the trakt ID index for a list of items, rebuilding it if the list changed"""
+    signature = (id(items), len(items), _items_generation)
+    entry = _trakt_indexes.get(name)
+    if entry is None or entry[0] != signature:
+        index = {}
+        for item in items:
+            trakt_id = (item.get('ids') or _EMPTY_DICT).get('trakt')
+            if trakt_id:
+                index.setdefault(trakt_id, item)  # First match wins, as with a linear scan
+        entry = _trakt_indexes[name] = (signature, index)
+    return entry[1]
+
+def _trakt_index_append(name, items, item):
+    """Append an item to a list and keep its trakt ID index current"""
+    index = _trakt_index(name, items)
+    items.append(item)
+    trakt_id = (item.get('ids') or _EMPTY_DICT).get('trakt')
+    if trakt_id:
+        index.setdefault(trakt_id, item)
+    _trakt_indexes[name] = ((id(items), len(items), _items_generation), index)
+
 def add_to_missing_items(item_data, item_type, collection_name, library_id=None, reason="No matching IDs found in Emby library"):
     """Add an item to missing_items list, preventing duplicates and handling multiple collections"""
     global _missing_items, _ignored_items
     
     # Check if we have enough data to identify the item
-    trakt_id = item_data.get('ids', {}).get('trakt')
+    trakt_id = (item_data.get('ids') or _EMPTY_DICT).get('trakt')
     title = item_data.get('title', 'Unknown')
     
     if not trakt_id:
@@ -396,40 +864,27 @@ def add_to_missing_items(item_data, item_type, collection_name, library_id=None,
     
     # First check if this item is in the ignored items list
     # If so, we shouldn't add it to missing items again
-    for ignored_item in _ignored_items:
-        ignored_trakt_id = ignored_item.get('ids', {}).get('trakt')
-        if ignored_trakt_id and ignored_trakt_id == trakt_id:
-            # Item is already ignored, just update its collections if needed
-            if 'collections' not in ignored_item:
-                ignored_item['collections'] = []
-                
-            # Add this collection if not already present
-            collection_exists = False
-            for coll in ignored_item['collections']:
-                if coll.get('name') == collection_name:
-                    collection_exists = True
-                    break
-                    
-            if not collection_exists:
-                ignored_item['collections'].append({
-                    'name': collection_name,
-                    'library_id': library_id
-                })
-                save_ignored_items()
+    ignored_item = _trakt_index('ignored', _ignored_items).get(trakt_id) if trakt_id else None
+    if ignored_item:
+        # Item is already ignored, just update its collections if needed
+        if 'collections' not in ignored_item:
+            ignored_item['collections'] = []
+            
+        # Add this collection if not already present
+        collection_exists = any(coll.get('name') == collection_name for coll in ignored_item['collections'])
                 
-            print(f"Info: {title} is in ignored items list, not adding to missing items")
-            return False
+        if not collection_exists:
+            ignored_item['collections'].append({
+                'name': collection_name,
+                'library_id': library_id
+            })
+            save_ignored_items()
+            
+        print(f"Info: {title} is in ignored items list, not adding to missing items")
+        return False
     
     # Check if this item is already in the missing items list
-    existing_item = None
-    existing_index = -1
-    
-    for i, item in enumerate(_missing_items):
-        item_trakt_id = item.get('ids', {}).get('trakt')
-        if trakt_id and item_trakt_id and trakt_id == item_trakt_id:
-            existing_item = item
-            existing_index = i
-            break
+    existing_item = _trakt_index('missing', _missing_items).get(trakt_id) if trakt_id else None
     
     # Format item data for adding to the list
     item_to_add = {
@@ -438,7 +893,7 @@ def add_to_missing_items(item_data, item_type, collection_name, library_id=None,
         'ids': item_data.get('ids', {}),
         'type': item_type,
         'reason': reason,
-        'last_checked': datetime.now().isoformat()
+        'last_checked': now_iso()
     }
     
     # Add the collection information
@@ -460,38 +915,54 @@ def add_to_missing_items(item_data, item_type, collection_name, library_id=None,
                 })
         
         # Check if this collection is already recorded
-        collection_exists = False
-        for coll in existing_item['collections']:
-            if coll.get('name') == collection_name:
-                collection_exists = True
-                break
+        collection_exists = any(coll.get('name') == collection_name for coll in existing_item['collections'])
                 
         if not collection_exists:
             # Add the new collection to the list
             existing_item['collections'].append(collection_info)
             
         # Update last checked time
-        existing_item['last_checked'] = datetime.now().isoformat()
+        existing_item['last_checked'] = item_to_add['last_checked']
     else:
         # New item - add with collection info in the new format
         item_to_add['collections'] = [collection_info]
-        _missing_items.append(item_to_add)
+        _trakt_index_append('missing', _missing_items, item_to_add)
+        # A new item only needs one line appended to the missing items file
+        return append_missing_item(item_to_add)
     
     # Save the missing items to file
     save_missing_items()
     
     return True
 
+# .env is re-parsed only when its (path, mtime, size) changes; a stat is far cheaper than a parse
+_env_path = find_dotenv()
+_env_file_key = None
+_env_lock = threading.Lock()
+
+def reload_env():
+    """Load .env into os.environ if it changed since the last load"""
+    global _env_path, _env_file_key
+    with _env_lock:
+        if not _env_path:
+            _env_path = find_dotenv()
+        try:
+            stat = os.stat(_env_path) if _env_path else None
+        except OSError:
+            stat = None
+        file_key = (_env_path, stat.st_mtime_ns, stat.st_size) if stat else None
+        if file_key and file_key != _env_file_key:
+            load_dotenv(_env_path, override=True)
+        _env_file_key = file_key
+
 def get_config(key):
-    """Get configuration value from environment variables - always load the most recent"""
-    # Always reload dotenv to get the latest values
-    load_dotenv(override=True)
+    """Get configuration value from environment variables - always the most recent"""
+    reload_env()
     return os.environ.get(key, '')
 
 def check_required_env_vars():
     """Check if all required configuration values are set - always from env file"""
-    # Always reload dotenv to get the latest values
-    load_dotenv(override=True)
+    reload_env()
     
     required_vars = [
         'TRAKT_CLIENT_ID',
@@ -508,8 +979,8 @@ def check_required_env_vars():
     
     return len(missing_vars) == 0, missing_vars
 
-# Always reload environment variables
-load_dotenv(override=True)
+# Load environment variables
+reload_env()
 
 # Check environment variables before initializing
 env_valid, missing_vars = check_required_env_vars()
@@ -523,8 +994,7 @@ load_emby_id_mappings()
 if env_valid:
     # Use function to get real-time values
     def get_env_value(key):
-        # Always reload dotenv to get the latest values
-        load_dotenv(override=True)
+        reload_env()
         return os.environ.get(key)
     
     # These will be refreshed before each use
@@ -548,6 +1018,15 @@ else:
     def get_EMBY_MOVIES_LIBRARY_ID(): return None
     def get_EMBY_TV_LIBRARY_ID(): return None
 
+def emby_connection():
+    """Return (server_url, headers) for Emby requests, built once per server/API key pair"""
+    return _emby_connection(get_EMBY_SERVER(), get_EMBY_API_KEY())
+
+@lru_cache(maxsize=1)  # Rebuilt automatically when the server or API key changes
+def _emby_connection(server, api_key):
+    # The headers dict is shared between callers, so it must not be modified
+    return (server or '').rstrip('/'), {'X-Emby-Token': api_key}
+
 # File to store access token
 TOKEN_FILE = 'trakt_token.json'
 
@@ -562,8 +1041,7 @@ def get_trakt_lists():
 
 def save_token(token_data):
     """Save token data to a file"""
-    with open(TOKEN_FILE, 'w') as f:
-        json.dump(token_data, f)
+    dump_json_file(token_data, TOKEN_FILE)
     print(f"Token saved to {TOKEN_FILE}")
 
 def load_token():
@@ -578,8 +1056,8 @@ def load_token():
 
 def refresh_access_token(refresh_token):
     """Use refresh token to get a new access token"""
-    # Reload environment variables
-    load_dotenv(override=True)
+    # Reload environment variables if .env changed
+    reload_env()
     
     # Get fresh credentials
     client_id = get_TRAKT_CLIENT_ID()
@@ -601,11 +1079,11 @@ def refresh_access_token(refresh_token):
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = _trakt_session.post(url, json=data, headers=headers)
         print(f"Refresh Token Response: {response.status_code}")
         
         if response.status_code == 200:
-            token_data = response.json()
+            token_data = response_json(response)
             save_token(token_data)
             access_token = token_data.get('access_token')
             if access_token:
@@ -625,8 +1103,8 @@ def refresh_access_token(refresh_token):
 
 def get_trakt_device_code():
     """Get a device code for Trakt authentication"""
-    # Reload environment variables
-    load_dotenv(override=True)
+    # Reload environment variables if .env changed
+    reload_env()
     
     # Get fresh credentials
     client_id = get_TRAKT_CLIENT_ID()
@@ -644,11 +1122,11 @@ def get_trakt_device_code():
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = _trakt_session.post(url, json=data, headers=headers)
         print(f"Device Code Response: {response.status_code}")
         
         if response.status_code == 200:
-            resp_json = response.json()
+            resp_json = response_json(response)
             device_code = resp_json.get('device_code')
             user_code = resp_json.get('user_code')
             verification_url = resp_json.get('verification_url')
@@ -665,10 +1143,18 @@ def get_trakt_device_code():
         print(f"Error in device code request: {str(e)}")
         return (None, None, None)
 
+# Device token poll replies after which polling the same code can never succeed:
+# invalid code, code already used, code expired, user denied
+TRAKT_POLL_FINAL_STATUSES = (404, 409, 410, 418)
+
 def poll_for_access_token(device_code, interval):
     """Poll for access token after user authorizes the device"""
-    # Reload environment variables
-    load_dotenv(override=True)
+    return poll_trakt_token_once(device_code)[0]
+
+def poll_trakt_token_once(device_code):
+    """Poll Trakt once for the device token, returning (access_token, status code); None for what is missing"""
+    # Reload environment variables if .env changed
+    reload_env()
     
     # Get fresh credentials
     client_id = get_TRAKT_CLIENT_ID()
@@ -676,7 +1162,7 @@ def poll_for_access_token(device_code, interval):
     
     if not client_id or not client_secret:
         print(" Missing Trakt credentials")
-        return None
+        return None, None
         
     url = 'https://api.trakt.tv/oauth/device/token'
     headers = {
@@ -691,31 +1177,32 @@ def poll_for_access_token(device_code, interval):
     # For Streamlit, we do a single poll each time the app reruns
     try:
         print(f"Polling for Trakt token with device code: {device_code}")
-        response = requests.post(url, json=data, headers=headers)
+        response = _trakt_session.post(url, json=data, headers=headers)
         print(f"Token Polling Response: {response.status_code}")
         
         if response.status_code == 200:
-            token_data = response.json()
+            token_data = response_json(response)
             save_token(token_data)
             access_token = token_data.get('access_token')
             if access_token:
                 print("Access token obtained and saved.")
-                return access_token
+            return access_token, response.status_code
         elif response.status_code == 404:
             print("Device code appears invalid.")
         elif response.status_code == 409:
-            print("Authorization pending. Waiting for user to authorize...")
+            print("The device code has already been used.")
         elif response.status_code == 410:
-            print("The tokens have expired. Please try again.")
+            print("The device code has expired. Please try again.")
         elif response.status_code == 418:
             print("User denied the authentication.")
         elif response.status_code == 400:
-            print("The device code is incorrect or has expired.")
+            print("Authorization pending. Waiting for user to authorize...")
+        return None, response.status_code
     except Exception as e:
         print(f"Error in token polling: {str(e)}")
     
     # Return None if we didn't get a token
-    return None
+    return None, None
 
 def get_trakt_list(list_id, access_token):
     url = f'https://api.trakt.tv/lists/{list_id}/items'
@@ -725,25 +1212,182 @@ def get_trakt_list(list_id, access_token):
         'trakt-api-version': '2',
         'trakt-api-key': get_TRAKT_CLIENT_ID()
     }
-    response = requests.get(url, headers=headers)
+    response = _trakt_session.get(url, headers=headers)
     print(f"Get Trakt List Response for list {list_id}: {response.status_code}")
     if response.status_code == 200:
-        return response.json()
+        return response_json(response)
     else:
         print(f"Error fetching Trakt list {list_id}: {response.status_code}")
         return []
 
+def get_trakt_lists_bulk(list_ids, access_token):
+    """Fetch several Trakt lists concurrently over the pooled session, returning {list_id: items}"""
+    list_ids = list(dict.fromkeys(list_ids))
+    if not list_ids:
+        return {}
+    
+    def fetch(list_id):
+        # The semaphore keeps us within Trakt's rate limit however many lists there are
+        with _trakt_api_semaphore:
+            try:
+                return get_trakt_list(list_id, access_token)
+            except Exception as e:
+                print(f"Error fetching Trakt list {list_id}: {e}")
+                return []
+    
+    with ThreadPoolExecutor(max_workers=min(RECHECK_MAX_WORKERS, len(list_ids))) as executor:
+        return dict(zip(list_ids, executor.map(fetch, list_ids)))
+
 # --- Emby Functions (modified) ---
 
+def library_cache_key(item_type, library_id):
+    """Key used for a library in _library_cache and _library_index"""
+    return f"{item_type}_{library_id}"
+
+def canonical_imdb_id(imdb_id):
+    """Canonical form of an IMDB ID ('tt'-prefixed, lowercase); Emby and Trakt don't always include the prefix"""
+    if not imdb_id:
+        return None
+    imdb_id = str(imdb_id).strip().lower()
+    if not imdb_id:
+        return None
+    return imdb_id if imdb_id.startswith('tt') else f"tt{imdb_id}"
+
+def build_library_index(items):
+    """Build provider-ID -> Emby ID lookups and precomputed title data for a list of library items"""
+    index = {'imdb': {}, 'tmdb': {}, 'tvdb': {}, 'trakt': {}, 'path_imdb': {}, 'by_id': {},
+             'name_year': {}, 'titles': [], 'by_year': {}, 'by_title': {}}
+    for item in items:
+        item_id = item.get('Id')
+        if not item_id:
+            continue
+        index['by_id'][item_id] = item
+        # Titles are normalized once per library fetch, not once per Trakt lookup
+        name = item.get('Name') or ''
+        normalized_name = normalize_title(name)
+        # Entries carry their library position so year buckets can be merged back into library order
+        entry = (len(index['titles']), normalized_name, frozenset(normalized_name.split()), item)
+        index['titles'].append(entry)
+        item_year = item.get('ProductionYear')
+        index['by_year'].setdefault(int(item_year) if item_year else None, []).append(entry)
+        index['by_title'].setdefault(normalized_name, []).append(entry)
+        index['name_year'].setdefault((name.lower(), item.get('ProductionYear')), item_id)
+        provider_ids = item.get('ProviderIds') or _EMPTY_DICT
+        for provider in ('imdb', 'tmdb', 'tvdb', 'trakt'):
+            pid = str(provider_ids.get(provider.capitalize(), '')).strip()
+            if provider == 'imdb':
+                pid = canonical_imdb_id(pid)
+            if pid:
+                # Keep the first item for an ID, as the old linear scans did
+                index[provider].setdefault(pid, item_id)
+        path_imdb_id = canonical_imdb_id(extract_imdb_from_path(item.get('Path', '')))
+        if path_imdb_id:
+            index['path_imdb'].setdefault(path_imdb_id, item_id)
+    return index
+
+def lookup_emby_id_by_provider(library_index, provider, pid):
+    """Look up an Emby item ID by provider ID (imdb, tmdb, tvdb, trakt or path_imdb) in a library index"""
+    if not pid:
+        return None
+    pid = canonical_imdb_id(pid) if provider in ('imdb', 'path_imdb') else str(pid).strip()
+    return library_index.get(provider, _EMPTY_DICT).get(pid)
+
+def get_cached_library(cache_key):
+    """Return cached library items if present and fresh, marking them recently used"""
+    with _library_cache_lock:
+        items = _library_cache.get(cache_key)
+        if items is None:
+            return None
+        if time.time() - _library_cache_times.get(cache_key, 0) > LIBRARY_CACHE_TTL:
+            drop_cached_library(cache_key)
+            return None
+        _library_cache.move_to_end(cache_key)
+        return items
+
+def store_cached_library(cache_key, items, fetched_at=None):
+    """Cache library items, evicting the least recently used libraries beyond the limit"""
+    index = build_library_index(items)
+    with _library_cache_lock:
+        _library_cache[cache_key] = items
+        _library_cache.move_to_end(cache_key)
+        _library_cache_times[cache_key] = fetched_at or time.time()
+        _library_index[cache_key] = index
+        while len(_library_cache) > LIBRARY_CACHE_MAX_ENTRIES:
+            drop_cached_library(next(iter(_library_cache)))
+
+def drop_cached_library(cache_key):
+    """Remove a library from the cache and its index"""
+    with _library_cache_lock:
+        _library_cache.pop(cache_key, None)
+        _library_cache_times.pop(cache_key, None)
+        _library_index.pop(cache_key, None)
+
+def library_disk_cache_path(disk_key):
+    """File holding the disk snapshot of one library"""
+    digest = hashlib.blake2b(disk_key.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{LIBRARY_DISK_CACHE_PREFIX}_{digest}{LIBRARY_DISK_CACHE_SUFFIX}"
+
+def library_disk_cache_files():
+    """Paths of all library snapshot files in the working directory"""
+    return [name for name in os.listdir('.')
+            if name.startswith(LIBRARY_DISK_CACHE_PREFIX) and name.endswith(LIBRARY_DISK_CACHE_SUFFIX)]
+
+def get_disk_cached_library(disk_key):
+    """Return (items, fetched_at) for a library snapshot on disk that is still fresh, or None"""
+    try:
+        with gzip.open(library_disk_cache_path(disk_key), 'rb') as f:
+            data = f.read()
+        entry = orjson.loads(data) if orjson else json.loads(data)
+    except (OSError, EOFError, ValueError):
+        return None
+    # The key is checked too, in case of a hash collision
+    if entry.get('key') == disk_key and time.time() - entry.get('fetched', 0) <= LIBRARY_CACHE_TTL:
+        return entry['items'], entry['fetched']
+    return None
+
+def store_disk_cached_library(disk_key, items):
+    """Save a library snapshot to disk, removing snapshot files that have expired"""
+    # Only this library's file is written, and not under _library_cache_lock, so concurrent
+    # fetches of other libraries never wait on this disk I/O
+    try:
+        now = time.time()
+        snapshot = {'key': disk_key, 'fetched': now, 'items': items}
+        # Fast compression: the snapshot is rewritten on every fetch and only has to beat the network
+        write_json_bytes(gzip.compress(dumps_json_line(snapshot), compresslevel=1), library_disk_cache_path(disk_key))
+        for path in library_disk_cache_files():
+            try:
+                if now - os.path.getmtime(path) > LIBRARY_CACHE_TTL:
+                    os.remove(path)
+            except OSError:
+                pass
+    except Exception as e:
+        print(f" Error saving library cache to disk: {e}")
+
+def slim_library_item(item):
+    """Keep only the fields matching uses; Path is kept only when it carries an [imdbid-...] tag"""
+    slim = {
+        'Id': item.get('Id'),
+        'Name': item.get('Name', ''),
+        'ProductionYear': item.get('ProductionYear'),
+        'ProviderIds': item.get('ProviderIds') or {}
+    }
+    path = item.get('Path')
+    if path and '[imdbid-' in path:
+        slim['Path'] = path
+    return slim
+
 def get_emby_library_items(item_type="Movie", library_id=None, force_refresh=False):
     """Get all items from Emby library with manual caching"""
-    global _library_cache
-    cache_key = f"{item_type}_{library_id}"
+    cache_key = library_cache_key(item_type, library_id)
     
     # Return cached data if available and not forced to refresh
-    if not force_refresh and cache_key in _library_cache:
-        print(f"Using cached {item_type} library data")
-        return _library_cache[cache_key]
+    if force_refresh:
+        drop_cached_library(cache_key)
+    else:
+        cached_items = get_cached_library(cache_key)
+        if cached_items is not None:
+            log_debug(f"Using cached {item_type} library data")
+            return cached_items
     
     # If no library ID provided, try to get from environment
     if not library_id:
@@ -757,14 +1401,21 @@ def get_emby_library_items(item_type="Movie", library_id=None, force_refresh=Fal
         return []
     
     # Remove trailing slash from server URL
-    server_url = get_EMBY_SERVER().rstrip('/')
+    server_url, headers = emby_connection()
+    
+    # A snapshot saved by a recent run (or the other process) saves refetching the library
+    disk_key = f"{server_url}|{library_id}|{item_type}"
+    if not force_refresh:
+        snapshot = get_disk_cached_library(disk_key)
+        if snapshot:
+            items, fetched_at = snapshot
+            log_debug(f"Using {item_type} library data saved on disk")
+            store_cached_library(cache_key, items, fetched_at)
+            return items
     
     try:
         # Fetch all items of the specified type from the library
         print(f"Fetching {item_type} items from Emby library {library_id}...")
-        headers = {
-            'X-Emby-Token': get_EMBY_API_KEY()
-        }
         
         # Enhanced params to get ALL provider IDs and relevant metadata
         params = {
@@ -772,60 +1423,110 @@ def get_emby_library_items(item_type="Movie", library_id=None, force_refresh=Fal
             "ParentId": library_id,
             "Recursive": "true",
             "Fields": "ProviderIds,Path,ProductionYear",
-            "EnableImages": "false"
+            "EnableImages": "false",
+            "EnableImageTypes": "",
+            "EnableUserData": "false"
         }
         
-        response = requests.get(f"{server_url}/Items", headers=headers, params=params)
+        def fetch_page(start_index):
+            page_params = dict(params, StartIndex=start_index, Limit=EMBY_PAGE_SIZE)
+            response = _emby_limit.call(
+                lambda: _emby_session.get(f"{server_url}/Items", headers=headers, params=page_params))
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            page = response_json(response)
+            page['Items'] = [slim_library_item(item) for item in page.get('Items', [])]
+            return page
         
-        if response.status_code == 200:
-            items = response.json().get('Items', [])
-            print(f" Found {len(items)} {item_type} items in Emby library")
-            _library_cache[cache_key] = items
-            return items
-        else:
-            print(f" Failed to fetch {item_type} items: HTTP {response.status_code}")
+        # The first page tells us how many items there are; the rest are fetched concurrently
+        try:
+            first_page = fetch_page(0)
+            items = first_page.get('Items', [])
+            total = first_page.get('TotalRecordCount', len(items))
+            # Step by the size the server actually returned, in case it caps pages below EMBY_PAGE_SIZE
+            page_size = len(items)
+            if page_size and total > page_size:
+                start_indexes = range(page_size, total, page_size)
+                with ThreadPoolExecutor(max_workers=EMBY_PAGE_WORKERS) as executor:
+                    pages = list(executor.map(fetch_page, start_indexes))
+                for start, page in zip(start_indexes, pages):
+                    page_items = page.get('Items', [])
+                    # A page that came back short would leave a gap; fetch the rest of it before moving on
+                    expected = min(page_size, total - start)
+                    while 0 < len(page_items) < expected:
+                        more = fetch_page(start + len(page_items)).get('Items', [])
+                        if not more:
+                            break
+                        page_items.extend(more[:expected - len(page_items)])
+                    items.extend(page_items)
+        except RuntimeError as e:
+            print(f" Failed to fetch {item_type} items: {e}")
             return []
+        
+        print(f" Found {len(items)} {item_type} items in Emby library")
+        store_cached_library(cache_key, items)
+        # Don't keep an incomplete library on disk, where the next processes would reuse it
+        if len(items) < total:
+            print(f" Expected {total} {item_type} items; not saving the incomplete library to disk")
+        else:
+            store_disk_cached_library(disk_key, items)
+        return items
     except Exception as e:
         print(f" Error fetching {item_type} items: {str(e)}")
         return []
 
+def created_collection_id(response, collection_name):
+    """Return the ID of a just-created collection from the creation response, or from a fresh collections fetch"""
+    try:
+        collection_id = response_json(response).get('Id')
+    except Exception:
+        collection_id = None
+    # Emby creates the collection before responding, so it can be looked up right away if the body has no Id
+    if not collection_id:
+        collection_id = get_all_collections_index(force_refresh=True).get(collection_name.lower())
+    if collection_id:
+        print(f"Created collection '{collection_name}' with ID: {collection_id}")
+        remember_collection(collection_name, collection_id)
+    return collection_id
+
 def create_collection_legacy_format(collection_name, movie_ids):
     """Create a collection using the legacy format for Emby 4.9"""
     if not movie_ids:
         print(f"No items to add to collection '{collection_name}'")
         return None
 
+    # Create with the first batch of IDs to keep the URL short; the rest are added in batches afterwards
+    first_ids = movie_ids[:COLLECTION_ADD_BATCH_SIZE]
+    rest_ids = movie_ids[COLLECTION_ADD_BATCH_SIZE:]
+    
     # Format IDs as comma-separated string
-    movie_ids_str = ",".join(str(movie_id) for movie_id in movie_ids)
+    movie_ids_str = ",".join(str(movie_id) for movie_id in first_ids)
     
     # Use the exact format from the provided example
     server_url = get_EMBY_SERVER().rstrip('/')
     api_key = get_EMBY_API_KEY()
     
-    # URL format with query parameters including api_key
-    url = f"{server_url}/Collections?api_key={api_key}&IsLocked=false&Name={collection_name}&Movies&Ids={movie_ids_str}"
+    # Query parameters including api_key; requests percent-encodes names containing &, =, # or spaces
+    url = f"{server_url}/Collections"
+    params = {
+        "api_key": api_key,
+        "IsLocked": "false",
+        "Name": collection_name,
+        "Ids": movie_ids_str
+    }
     
     print(f"Creating collection '{collection_name}' with {len(movie_ids)} items using legacy format")
     try:
         # Send POST request without headers or body
-        response = requests.post(url)
+        response = _emby_session.post(url, params=params)
         print(f"Collection creation response: {response.status_code} - {response.text}")
         
         if response.status_code in (200, 201, 204):
-            try:
-                result = response.json()
-                collection_id = result.get('Id')
-                if collection_id:
-                    print(f"Created collection with ID: {collection_id}")
-                    return collection_id
-            except Exception as e:
-                print(f"Error parsing response: {str(e)}")
-            
-            # If we can't get ID from response, search for the collection
-            time.sleep(1)
-            collection_id = find_collection_by_name(collection_name)
+            collection_id = created_collection_id(response, collection_name)
             if collection_id:
-                print(f"Created collection '{collection_name}' with ID: {collection_id}")
+                if rest_ids:
+                    added = len(first_ids) + add_movies_to_emby_collection(rest_ids, collection_id)
+                    print(f"Added {added} of {len(movie_ids)} items to collection")
                 return collection_id
             
         print(f"Failed to create collection: {response.status_code}")
@@ -853,8 +1554,7 @@ def create_emby_collection_with_movies(collection_name, movie_ids):
         
     # If legacy format fails, try creating with the first item
     print("Legacy format failed. Trying alternative method...")
-    server_url = get_EMBY_SERVER().rstrip('/')
-    headers = {'X-Emby-Token': get_EMBY_API_KEY()}
+    server_url, headers = emby_connection()
     
     # Take the first item and create a collection with it
     first_movie_id = movie_ids[0]
@@ -865,22 +1565,17 @@ def create_emby_collection_with_movies(collection_name, movie_ids):
     }
     
     try:
-        create_response = requests.post(create_url, headers=headers, params=create_params)
+        create_response = _emby_session.post(create_url, headers=headers, params=create_params)
         print(f"Alternative creation response: {create_response.status_code} - {create_response.text}")
         
         if create_response.status_code in (200, 201, 204):
             # Now find the collection ID
-            time.sleep(1)
-            collection_id = find_collection_by_name(collection_name)
+            collection_id = created_collection_id(create_response, collection_name)
             
             if collection_id:
-                print(f"Created collection '{collection_name}' with ID: {collection_id}")
-                
-                # Add the rest of the items
+                # Add the rest of the items in batches
                 success_count = 1  # First item already added
-                for movie_id in movie_ids[1:]:
-                    if add_movie_to_emby_collection(movie_id, collection_id):
-                        success_count += 1
+                success_count += add_movies_to_emby_collection(movie_ids[1:], collection_id)
                 
                 print(f"Added {success_count} of {len(movie_ids)} items to collection")
                 return collection_id
@@ -892,62 +1587,92 @@ def create_emby_collection_with_movies(collection_name, movie_ids):
         return None
 
 def find_collection_by_name(collection_name):
-    """Find a collection by name - simplified version"""
-    # Remove trailing slash from server URL
-    server_url = get_EMBY_SERVER().rstrip('/')
-        
-    search_url = f'{server_url}/Items'
-    headers = {
-        'X-Emby-Token': get_EMBY_API_KEY()
-    }
-    params = {
-        "IncludeItemTypes": "BoxSet",
-        "Recursive": "true",
-        "Fields": "Name,Id"
-    }
-    
-    try:
-        search_response = requests.get(search_url, headers=headers, params=params)
-        
-        if search_response.status_code == 200:
-            results = search_response.json()
-            items = results.get('Items', [])
-            
-            for item in items:
-                if item.get('Name', '').lower() == collection_name.lower():
-                    collection_id = item.get('Id')
-                    print(f"Found collection '{item.get('Name')}' with ID: {collection_id}")
-                    return collection_id
-        else:
-            print(f"Error searching for collection: HTTP {search_response.status_code}")
-            print(f"Response: {search_response.text}")
-        
-        return None
-    except Exception as e:
-        print(f"Error finding collection: {e}")
-        return None
-
+    """Find a collection by name through the cached collections index"""
+    key = collection_name.lower()
+    fetched_at = _collections_index_time
+    collection_id = get_all_collections_index().get(key)
+    # On a miss against an index that was not just fetched, the collection may be newer than it
+    if not collection_id and not _collections_index_complete and fetched_at and _collections_index_time == fetched_at:
+        collection_id = get_all_collections_index(force_refresh=True).get(key)
+    if collection_id and _verbose_logging:
+        log_debug(f"Found collection '{collection_name}' with ID: {collection_id}")
+    return collection_id
+
+# Patterns used by normalize_title, compiled once
+_RE_YEAR = re.compile(r'\s*\(\d{4}\)\s*')
+_RE_NONWORD = re.compile(r'[^\w\s]')
+_RE_ARTICLE = re.compile(r'^(?:the|a|an)\s+')
+_RE_MARVEL = re.compile(r'^marvel\'?s\s+')
+
+# The same library titles are normalized for every Trakt item, and the result depends only on the title
+@lru_cache(maxsize=131072)
 def normalize_title(title):
     """Normalize title for comparison by removing common variations"""
     # Convert to lowercase
     title = title.lower()
     # Remove year in parentheses
-    title = re.sub(r'\s*\(\d{4}\)\s*', '', title)
+    title = _RE_YEAR.sub('', title)
     # Remove special characters and extra spaces
-    title = re.sub(r'[^\w\s]', '', title)
+    title = _RE_NONWORD.sub('', title)
     # Remove common prefixes
-    title = re.sub(r'^(the|a|an)\s+', '', title)
+    title = _RE_ARTICLE.sub('', title)
     # Remove "Marvel's" prefix
-    title = re.sub(r'^marvel\'?s\s+', '', title)
+    title = _RE_MARVEL.sub('', title)
     # Normalize spaces
     title = ' '.join(title.split())
     return title
 
+def fuzzy_match_library_item(library_index, title, year):
+    """Find the best fuzzy title match in a library index, returning (item, score)"""
+    normalized_title = normalize_title(title)
+    if not normalized_title:
+        return None, 0
+    title_words = frozenset(normalized_title.split())
+    best_match = None
+    best_score = 0
+    
+    # An exact normalized-title match always wins, so look for one directly before scoring every candidate
+    for _, _, _, item in library_index.get('by_title', _EMPTY_DICT).get(normalized_title, ()):
+        item_year = item.get('ProductionYear')
+        if not year or not item_year or abs(int(year) - int(item_year)) <= 1:
+            return item, 1.0
+    
+    # Only items within a year of the requested one, or without a year, can match
+    if year:
+        by_year = library_index.get('by_year', _EMPTY_DICT)
+        candidates = heapq.merge(*(by_year.get(y, []) for y in (int(year) - 1, int(year), int(year) + 1, None)))
+    else:
+        candidates = library_index.get('titles', [])
+    
+    for _, normalized_item_title, item_words, item in candidates:
+        # Calculate similarity using different methods
+        # 1. Direct equality after normalization
+        if normalized_title == normalized_item_title:
+            return item, 1.0
+            
+        # 2. Check if one title is contained within the other
+        if normalized_title in normalized_item_title or normalized_item_title in normalized_title:
+            score = 0.9
+            if not best_match or score > best_score:
+                best_match = item
+                best_score = score
+                
+        # 3. Check for word overlap percentage
+        if title_words and item_words:  # Avoid division by zero
+            overlap_score = len(title_words & item_words) / max(len(title_words), len(item_words))
+            if overlap_score > 0.6 and overlap_score > best_score:  # At least 60% word overlap
+                best_match = item
+                best_score = overlap_score
+                if best_score >= 1.0:  # Nothing later can score higher
+                    break
+    
+    return best_match, best_score
+
 def print_item_details(item_type, items):
     """Print detailed library contents for debugging"""
     print(f"\nEmby {item_type} Library Details:")
     for item in items:
-        provider_ids = item.get('ProviderIds', {})
+        provider_ids = item.get('ProviderIds') or _EMPTY_DICT
         print(f"\nTitle: {item.get('Name')}")
         if provider_ids.get('Imdb'): print(f"IMDB: {provider_ids['Imdb']}")
         if provider_ids.get('Tmdb'): print(f"TMDB: {provider_ids['Tmdb']}")
@@ -956,7 +1681,8 @@ def print_item_details(item_type, items):
 def search_movie_in_emby(title, year, provider_ids=None, library_id=None):
     """Search for a movie in Emby using provider IDs and stored mappings"""
     if not provider_ids:
-        print(f" No provider IDs available for movie: {title}")
+        if _verbose_logging:
+            log_debug(f" No provider IDs available for movie: {title}")
         return None
 
     # First, check if we have a stored mapping for this movie
@@ -966,123 +1692,90 @@ def search_movie_in_emby(title, year, provider_ids=None, library_id=None):
         # Check if we have a stored Emby ID for this Trakt ID
         emby_id = get_emby_id_from_mapping("movie", trakt_id)
         if emby_id:
-            print(f" Found Emby ID from stored mapping for {title}: {emby_id}")
+            if _verbose_logging:
+                log_debug(f" Found Emby ID from stored mapping for {title}: {emby_id}")
             return emby_id
 
-    # Get cached library items
+    # Get cached library items; provider IDs are looked up through the index built with them
     library_items = get_emby_library_items("Movie", library_id)
+    cache_key = library_cache_key("Movie", library_id)
+    library_index = _library_index.get(cache_key, {'by_id': {}})  # Resolved once for all lookups below
     
-    print(f"\n Searching for movie: {title} ({year})")
-    print(f" Provider IDs from Trakt: {provider_ids}")
+    if _verbose_logging:
+        log_debug(f"\n Searching for movie: {title} ({year})")
+        log_debug(f" Provider IDs from Trakt: {provider_ids}")
     
     # Try IMDB ID (most reliable)
     if provider_ids.get('imdb'):
         imdb_id = provider_ids['imdb']
-        print(f"Checking IMDB ID: {imdb_id}")
-        for item in library_items:
-            item_provider_ids = item.get('ProviderIds', {})
-            emby_imdb_id = item_provider_ids.get('Imdb', '').strip()
-            if emby_imdb_id and emby_imdb_id == imdb_id:
-                emby_id = item.get('Id')
-                print(f" Found IMDB match: {item.get('Name')} (Emby ID: {emby_id})")
-                # Store this mapping for future use
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, "movie", title)
-                return emby_id
-                
-            # Check for IMDB ID in file path
-            path = item.get('Path', '')
-            if path:
-                path_imdb_id = extract_imdb_from_path(path)
-                if path_imdb_id and path_imdb_id == imdb_id:
-                    emby_id = item.get('Id')
-                    print(f" Found IMDB match in path: {item.get('Name')} (Emby ID: {emby_id})")
-                    # Store this mapping for future use
-                    if trakt_id:
-                        add_emby_id_mapping(trakt_id, emby_id, "movie", title)
-                    return emby_id
+        if _verbose_logging:
+            log_debug(f"Checking IMDB ID: {imdb_id}")
+        emby_id = lookup_emby_id_by_provider(library_index, 'imdb', imdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found IMDB match: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "movie", title)
+            return emby_id
+            
+        # Check for IMDB ID in file path
+        emby_id = lookup_emby_id_by_provider(library_index, 'path_imdb', imdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found IMDB match in path: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "movie", title)
+            return emby_id
     else:
-        print(" No IMDB ID available")
+        log_debug(" No IMDB ID available")
     
     # Try TMDB ID
     if provider_ids.get('tmdb'):
         tmdb_id = provider_ids['tmdb']
-        print(f"Checking TMDB ID: {tmdb_id}")
-        for item in library_items:
-            item_provider_ids = item.get('ProviderIds', {})
-            emby_tmdb_id = item_provider_ids.get('Tmdb', '').strip()
-            if emby_tmdb_id and emby_tmdb_id == tmdb_id:
-                emby_id = item.get('Id')
-                print(f" Found TMDB match: {item.get('Name')} (Emby ID: {emby_id})")
-                # Store this mapping for future use
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, "movie", title)
-                return emby_id
+        if _verbose_logging:
+            log_debug(f"Checking TMDB ID: {tmdb_id}")
+        emby_id = lookup_emby_id_by_provider(library_index, 'tmdb', tmdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found TMDB match: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "movie", title)
+            return emby_id
     else:
-        print(" No TMDB ID available")
+        log_debug(" No TMDB ID available")
     
     # If no provider ID match found, try fuzzy title matching as last resort
-    print(f" Trying fuzzy title matching for: {title}")
-    normalized_title = normalize_title(title)
-    best_match = None
-    best_score = 0
-    
-    for item in library_items:
-        item_title = item.get('Name', '')
-        item_year = item.get('ProductionYear')
-        
-        # Skip items with significantly different years if both years are available
-        if year and item_year and abs(int(year) - int(item_year)) > 1:
-            continue
-            
-        # Normalize both titles for comparison
-        normalized_item_title = normalize_title(item_title)
-        
-        # Calculate similarity using different methods
-        # 1. Direct equality after normalization
-        if normalized_title == normalized_item_title:
-            best_match = item
-            best_score = 1.0
-            break
-            
-        # 2. Check if one title is contained within the other
-        if normalized_title in normalized_item_title or normalized_item_title in normalized_title:
-            score = 0.9
-            if not best_match or score > best_score:
-                best_match = item
-                best_score = score
-                
-        # 3. Check for word overlap percentage
-        title_words = set(normalized_title.split())
-        item_words = set(normalized_item_title.split())
-        if title_words and item_words:  # Avoid division by zero
-            common_words = title_words.intersection(item_words)
-            overlap_score = len(common_words) / max(len(title_words), len(item_words))
-            if overlap_score > 0.6 and overlap_score > best_score:  # At least 60% word overlap
-                best_match = item
-                best_score = overlap_score
+    if _verbose_logging:
+        log_debug(f" Trying fuzzy title matching for: {title}")
+    best_match, best_score = fuzzy_match_library_item(library_index, title, year)
     
     # If we found a good match
     if best_match and best_score >= 0.6:  # Threshold for accepting matches
         emby_id = best_match.get('Id')
-        print(f" Found title match: {best_match.get('Name')} (score: {best_score:.2f}, Emby ID: {emby_id})")
+        if _verbose_logging:
+            log_debug(f" Found title match: {best_match.get('Name')} (score: {best_score:.2f}, Emby ID: {emby_id})")
         # Store this mapping for future use
         if trakt_id:
             add_emby_id_mapping(trakt_id, emby_id, "movie", title)
         return emby_id
     
     # If no match found, print some debug info
-    print(f" No matches found for: {title}")
-    print("Debug info for first few library items:")
-    for item in library_items[:3]:
-        print(f"  Library item: {item.get('Name')}")
-        print(f"  Provider IDs: {item.get('ProviderIds', {})}")
+    if _verbose_logging:
+        log_debug(f" No matches found for: {title}")
+        print("Debug info for first few library items:")
+        for item in library_items[:3]:
+            print(f"  Library item: {item.get('Name')}")
+            print(f"  Provider IDs: {item.get('ProviderIds', {})}")
     return None
 
 def search_tv_show_in_emby(title, year, provider_ids=None, library_id=None):
     """Search for a TV show in Emby using provider IDs and stored mappings"""
     if not provider_ids:
-        print(f" No provider IDs available for TV show: {title}")
+        if _verbose_logging:
+            log_debug(f" No provider IDs available for TV show: {title}")
         return None
 
     # First, check if we have a stored mapping for this TV show
@@ -1092,156 +1785,120 @@ def search_tv_show_in_emby(title, year, provider_ids=None, library_id=None):
         # Check if we have a stored Emby ID for this Trakt ID
         emby_id = get_emby_id_from_mapping("show", trakt_id)
         if emby_id:
-            print(f" Found Emby ID from stored mapping for {title}: {emby_id}")
+            if _verbose_logging:
+                log_debug(f" Found Emby ID from stored mapping for {title}: {emby_id}")
             return emby_id
 
-    # Get cached library items
+    # Get cached library items; provider IDs are looked up through the index built with them
     library_items = get_emby_library_items("Series", library_id)
+    cache_key = library_cache_key("Series", library_id)
+    library_index = _library_index.get(cache_key, {'by_id': {}})  # Resolved once for all lookups below
     
-    print(f"\n Searching for TV show: {title} ({year})")
-    print(f" Provider IDs from Trakt: {provider_ids}")
+    if _verbose_logging:
+        log_debug(f"\n Searching for TV show: {title} ({year})")
+        log_debug(f" Provider IDs from Trakt: {provider_ids}")
     
     # Try TVDB ID (most reliable for TV shows)
     if provider_ids.get('tvdb'):
         tvdb_id = provider_ids['tvdb']
-        print(f"Checking TVDB ID: {tvdb_id}")
-        for item in library_items:
-            item_provider_ids = item.get('ProviderIds', {})
-            emby_tvdb_id = item_provider_ids.get('Tvdb', '').strip()
-            if emby_tvdb_id and emby_tvdb_id == tvdb_id:
-                emby_id = item.get('Id')
-                print(f" Found TVDB match: {item.get('Name')} (Emby ID: {emby_id})")
-                # Store this mapping for future use
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, "show", title)
-                return emby_id
+        if _verbose_logging:
+            log_debug(f"Checking TVDB ID: {tvdb_id}")
+        emby_id = lookup_emby_id_by_provider(library_index, 'tvdb', tvdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found TVDB match: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "show", title)
+            return emby_id
     else:
-        print(" No TVDB ID available")
+        log_debug(" No TVDB ID available")
     
     # Try TMDB ID
     if provider_ids.get('tmdb'):
         tmdb_id = provider_ids['tmdb']
-        print(f"Checking TMDB ID: {tmdb_id}")
-        for item in library_items:
-            item_provider_ids = item.get('ProviderIds', {})
-            emby_tmdb_id = item_provider_ids.get('Tmdb', '').strip()
-            if emby_tmdb_id and emby_tmdb_id == tmdb_id:
-                emby_id = item.get('Id')
-                print(f" Found TMDB match: {item.get('Name')} (Emby ID: {emby_id})")
-                # Store this mapping for future use
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, "show", title)
-                return emby_id
+        if _verbose_logging:
+            log_debug(f"Checking TMDB ID: {tmdb_id}")
+        emby_id = lookup_emby_id_by_provider(library_index, 'tmdb', tmdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found TMDB match: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "show", title)
+            return emby_id
     else:
-        print(" No TMDB ID available")
+        log_debug(" No TMDB ID available")
     
     # Try IMDB ID as last resort
     if provider_ids.get('imdb'):
         imdb_id = provider_ids['imdb']
-        print(f"Checking IMDB ID: {imdb_id}")
-        for item in library_items:
-            item_provider_ids = item.get('ProviderIds', {})
-            emby_imdb_id = item_provider_ids.get('Imdb', '').strip()
-            if emby_imdb_id and emby_imdb_id == imdb_id:
-                emby_id = item.get('Id')
-                print(f" Found IMDB match: {item.get('Name')} (Emby ID: {emby_id})")
-                # Store this mapping for future use
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, "show", title)
-                return emby_id
-                
-            # Check for IMDB ID in file path
-            path = item.get('Path', '')
-            if path:
-                path_imdb_id = extract_imdb_from_path(path)
-                if path_imdb_id and path_imdb_id == imdb_id:
-                    emby_id = item.get('Id')
-                    print(f" Found IMDB match in path: {item.get('Name')} (Emby ID: {emby_id})")
-                    # Store this mapping for future use
-                    if trakt_id:
-                        add_emby_id_mapping(trakt_id, emby_id, "show", title)
-                    return emby_id
+        if _verbose_logging:
+            log_debug(f"Checking IMDB ID: {imdb_id}")
+        emby_id = lookup_emby_id_by_provider(library_index, 'imdb', imdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found IMDB match: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "show", title)
+            return emby_id
+            
+        # Check for IMDB ID in file path
+        emby_id = lookup_emby_id_by_provider(library_index, 'path_imdb', imdb_id)
+        if emby_id:
+            if _verbose_logging:
+                log_debug(f" Found IMDB match in path: {library_index['by_id'][emby_id].get('Name')} (Emby ID: {emby_id})")
+            # Store this mapping for future use
+            if trakt_id:
+                add_emby_id_mapping(trakt_id, emby_id, "show", title)
+            return emby_id
     else:
-        print(" No IMDB ID available")
+        log_debug(" No IMDB ID available")
     
     # If no provider ID match found, try fuzzy title matching as last resort
-    print(f" Trying fuzzy title matching for: {title}")
-    normalized_title = normalize_title(title)
-    best_match = None
-    best_score = 0
-    
-    for item in library_items:
-        item_title = item.get('Name', '')
-        item_year = item.get('ProductionYear')
-        
-        # Skip items with significantly different years if both years are available
-        if year and item_year and abs(int(year) - int(item_year)) > 1:
-            continue
-            
-        # Normalize both titles for comparison
-        normalized_item_title = normalize_title(item_title)
-        
-        # Calculate similarity using different methods
-        # 1. Direct equality after normalization
-        if normalized_title == normalized_item_title:
-            best_match = item
-            best_score = 1.0
-            break
-            
-        # 2. Check if one title is contained within the other
-        if normalized_title in normalized_item_title or normalized_item_title in normalized_title:
-            score = 0.9
-            if not best_match or score > best_score:
-                best_match = item
-                best_score = score
-                
-        # 3. Check for word overlap percentage
-        title_words = set(normalized_title.split())
-        item_words = set(normalized_item_title.split())
-        if title_words and item_words:  # Avoid division by zero
-            common_words = title_words.intersection(item_words)
-            overlap_score = len(common_words) / max(len(title_words), len(item_words))
-            if overlap_score > 0.6 and overlap_score > best_score:  # At least 60% word overlap
-                best_match = item
-                best_score = overlap_score
+    if _verbose_logging:
+        log_debug(f" Trying fuzzy title matching for: {title}")
+    best_match, best_score = fuzzy_match_library_item(library_index, title, year)
     
     # If we found a good match
     if best_match and best_score >= 0.6:  # Threshold for accepting matches
         emby_id = best_match.get('Id')
-        print(f" Found title match: {best_match.get('Name')} (score: {best_score:.2f}, Emby ID: {emby_id})")
+        if _verbose_logging:
+            log_debug(f" Found title match: {best_match.get('Name')} (score: {best_score:.2f}, Emby ID: {emby_id})")
         # Store this mapping for future use
         if trakt_id:
             add_emby_id_mapping(trakt_id, emby_id, "show", title)
         return emby_id
     
     # If no match found, print some debug info
-    print(f" No matches found for: {title}")
-    print("Debug info for first few library items:")
-    for item in library_items[:3]:
-        print(f"  Library item: {item.get('Name')}")
-        print(f"  Provider IDs: {item.get('ProviderIds', {})}")
+    if _verbose_logging:
+        log_debug(f" No matches found for: {title}")
+        print("Debug info for first few library items:")
+        for item in library_items[:3]:
+            print(f"  Library item: {item.get('Name')}")
+            print(f"  Provider IDs: {item.get('ProviderIds', {})}")
     return None
 
 def add_movie_to_emby_collection(movie_id, collection_id):
     """Add a movie to a collection in Emby 4.9"""
     # Remove trailing slash from server URL
-    server_url = get_EMBY_SERVER().rstrip('/')
+    server_url, headers = emby_connection()
         
     # Try first API format - direct add to collection
     url = f'{server_url}/Collections/{collection_id}/Items'
-    headers = {
-        'X-Emby-Token': get_EMBY_API_KEY()
-    }
     params = {
         "Ids": movie_id
     }
     
     try:
-        response = requests.post(url, headers=headers, params=params)
-        print(f"Add movie response: {response.status_code}")
+        response = _emby_session.post(url, headers=headers, params=params)
+        if _verbose_logging:
+            log_debug(f"Add movie response: {response.status_code}")
         
         if response.status_code in (200, 201, 204):
-            print(f"Successfully added movie ID {movie_id} to collection ID {collection_id}")
+            if _verbose_logging:
+                log_debug(f"Successfully added movie ID {movie_id} to collection ID {collection_id}")
             return True
         else:
             print(f"Failed to add movie ID {movie_id} to collection ID {collection_id}")
@@ -1255,25 +1912,27 @@ def add_movie_to_emby_collection(movie_id, collection_id):
             }
             
             # Get the current item data first
-            get_response = requests.get(
+            get_response = _emby_session.get(
                 alt_url, 
-                headers={'X-Emby-Token': get_EMBY_API_KEY()}
+                headers=headers
             )
             
             if get_response.status_code == 200:
                 try:
                     # Try to add collection ID to the item
-                    print(f"Trying alternative method to add movie {movie_id} to collection {collection_id}")
+                    if _verbose_logging:
+                        log_debug(f"Trying alternative method to add movie {movie_id} to collection {collection_id}")
                     
                     # Use the POST to Collection/{Id}/Items endpoint with IDs in querystring
                     post_url = f'{server_url}/Collections/{collection_id}/Items'
                     post_params = {
                         "Ids": movie_id
                     }
-                    post_response = requests.post(post_url, headers=headers, params=post_params)
+                    post_response = _emby_session.post(post_url, headers=headers, params=post_params)
                     
                     if post_response.status_code in (200, 201, 204):
-                        print(f"Successfully added movie ID {movie_id} to collection ID {collection_id} using alternative method")
+                        if _verbose_logging:
+                            log_debug(f"Successfully added movie ID {movie_id} to collection ID {collection_id} using alternative method")
                         return True
                     else:
                         print(f"Failed with alternative method too: {post_response.status_code} - {post_response.text}")
@@ -1288,7 +1947,25 @@ def add_movie_to_emby_collection(movie_id, collection_id):
         print(f"Exception adding movie: {e}")
         return False
 
-def process_item(item, access_token, library_id=None, collection_name=None):
+def add_movies_to_emby_collection(movie_ids, collection_id):
+    """Add movies to a collection in batches of COLLECTION_ADD_BATCH_SIZE IDs, returning how many were added"""
+    movie_ids = [str(movie_id) for movie_id in movie_ids]
+    batches = [movie_ids[start:start + COLLECTION_ADD_BATCH_SIZE]
+               for start in range(0, len(movie_ids), COLLECTION_ADD_BATCH_SIZE)]
+    if not batches:
+        return 0
+    
+    def add_batch(batch):
+        # A failed add is treated as overload, which only costs a little concurrency if it was not
+        added = _emby_limit.call(lambda: add_movie_to_emby_collection(','.join(batch), collection_id),
+                                 overloaded=lambda ok: not ok)
+        return len(batch) if added else 0
+    
+    # The batch requests are independent, so send them concurrently over the pooled session
+    with ThreadPoolExecutor(max_workers=min(EMBY_PAGE_WORKERS, len(batches))) as executor:
+        return sum(executor.map(add_batch, batches))
+
+def process_item(item, access_token, library_id=None, collection_name=None, library_indexes=None):
     """Process a single item from Trakt list using multiple ID types for robust matching"""
     global _missing_items, _library_cache
     
@@ -1299,15 +1976,17 @@ def process_item(item, access_token, library_id=None, collection_name=None):
     
     title = media.get("title", "")
     year = media.get("year")
-    ids = media.get("ids", {})
+    ids = media.get("ids") or _EMPTY_DICT
     
-    log_info(f"\n Processing item: {title} ({year})")
+    if _verbose_logging:
+        log_debug(f"\n Processing item: {title} ({year})")
     
     # Check if we have any usable IDs
     if not ids or not (ids.get('imdb') or ids.get('tmdb') or ids.get('trakt')):
         log_info(f" No usable IDs found for: {title}")
         # Add to missing items
-        add_to_missing_items(media, item.get("type"), collection_name, library_id, "No usable IDs available")
+        with _missing_items_lock:
+            add_to_missing_items(media, item.get("type"), collection_name, library_id, "No usable IDs available")
         return None
     
     # Extract and normalize all available IDs
@@ -1321,106 +2000,54 @@ def process_item(item, access_token, library_id=None, collection_name=None):
         item_type = "movie" if item.get("type") == "movie" else "show"
         emby_id = get_emby_id_from_mapping(item_type, trakt_id)
         if emby_id:
-            log_debug(f" Found stored mapping for {title}: {emby_id}")
+            if _verbose_logging:
+                log_debug(f" Found stored mapping for {title}: {emby_id}")
             return {"id": emby_id, "type": item.get("type")}
     
-    # Get appropriate library items based on type
-    if item.get("type") == "movie":
-        library_items = get_emby_library_items("Movie", library_id)
+    # Get the index for the appropriate library; it is built once when the library is cached, and
+    # process_items_batch resolves it once for a whole list instead of once per item
+    emby_item_type = "Movie" if item.get("type") == "movie" else "Series"
+    if library_indexes is None:
+        get_emby_library_items(emby_item_type, library_id)
+        library_index = _library_index.get(library_cache_key(emby_item_type, library_id), {})
     else:
-        library_items = get_emby_library_items("Series", library_id)
-    
-    # Create lookup dictionaries for all ID types
-    imdb_lookup = {}
-    tmdb_lookup = {}
-    tvdb_lookup = {}
-    path_imdb_lookup = {}
-    
-    # Build comprehensive lookup tables
-    for lib_item in library_items:
-        lib_id = lib_item.get('Id')
-        provider_ids = lib_item.get('ProviderIds', {})
-        
-        # IMDB ID from metadata - normalize by removing any prefix and ensuring lowercase
-        emby_imdb_id = provider_ids.get('Imdb', '').strip()
-        if emby_imdb_id:
-            # Sometimes Emby stores IMDB IDs with 'tt' prefix removed, so check both formats
-            imdb_lookup[emby_imdb_id] = lib_id
-            # If it doesn't start with tt, add it as an alternative
-            if not emby_imdb_id.startswith('tt') and len(emby_imdb_id) > 5:
-                imdb_lookup[f"tt{emby_imdb_id}"] = lib_id
-            # If it does start with tt, add version without it
-            elif emby_imdb_id.startswith('tt'):
-                imdb_lookup[emby_imdb_id[2:]] = lib_id
-        
-        # TMDB ID from metadata - similar normalization
-        emby_tmdb_id = provider_ids.get('Tmdb', '').strip()
-        if emby_tmdb_id:
-            tmdb_lookup[emby_tmdb_id] = lib_id
-        
-        # TVDB ID from metadata
-        emby_tvdb_id = provider_ids.get('Tvdb', '').strip()
-        if emby_tvdb_id:
-            tvdb_lookup[emby_tvdb_id] = lib_id
-        
-        # Check file path for IMDB ID
-        path = lib_item.get('Path', '')
-        if path:
-            path_imdb_id = extract_imdb_from_path(path)
-            if path_imdb_id:
-                path_imdb_lookup[path_imdb_id] = lib_id
-    
-    # Normalize Trakt IDs the same way Emby might store them
-    normalized_imdb_id = imdb_id
-    if imdb_id and imdb_id.startswith('tt'):
-        normalized_imdb_id_no_prefix = imdb_id[2:]
-    else:
-        normalized_imdb_id_no_prefix = imdb_id
-        if imdb_id and not imdb_id.startswith('tt'):
-            normalized_imdb_id = f"tt{imdb_id}"
+        library_index = library_indexes.get(emby_item_type, {})
+    
+    # IMDB IDs are indexed in canonical form, so one lookup covers IDs with or without the 'tt' prefix
+    imdb_key = canonical_imdb_id(imdb_id)
     
     # Try matching with each available ID type in order of reliability
     matched_emby_id = None
     match_source = None
     
-    # 1. Try direct IMDB ID match from metadata (most reliable) - using both formats
-    if normalized_imdb_id and normalized_imdb_id in imdb_lookup:
-        matched_emby_id = imdb_lookup[normalized_imdb_id]
-        match_source = "IMDB metadata"
-    elif normalized_imdb_id_no_prefix and normalized_imdb_id_no_prefix in imdb_lookup:
-        matched_emby_id = imdb_lookup[normalized_imdb_id_no_prefix]
-        match_source = "IMDB metadata (no prefix)"
-    
+    # 1. Try direct IMDB ID match from metadata (most reliable)
     # 2. Try IMDB ID from file path as fallback
-    elif normalized_imdb_id and normalized_imdb_id in path_imdb_lookup:
-        matched_emby_id = path_imdb_lookup[normalized_imdb_id]
-        match_source = "IMDB in filename"
-    
     # 3. Try TMDB ID
-    elif tmdb_id and tmdb_id in tmdb_lookup:
-        matched_emby_id = tmdb_lookup[tmdb_id]
-        match_source = "TMDB"
-    
     # 4. Try TVDB ID (for TV shows)
-    elif tvdb_id and tvdb_id in tvdb_lookup and item.get("type") == "show":
-        matched_emby_id = tvdb_lookup[tvdb_id]
-        match_source = "TVDB"
+    lookups = [
+        ('imdb', imdb_key, "IMDB metadata"),
+        ('path_imdb', imdb_key, "IMDB in filename"),
+        ('tmdb', tmdb_id, "TMDB"),
+    ]
+    if item.get("type") == "show":
+        lookups.append(('tvdb', tvdb_id, "TVDB"))
+    for provider, pid, source in lookups:
+        matched_emby_id = library_index.get(provider, _EMPTY_DICT).get(pid) if pid else None
+        if matched_emby_id:
+            match_source = source
+            break
     
     # 5. Try fuzzy name match with year if nothing else works
     if not matched_emby_id and year:
-        for lib_item in library_items:
-            lib_name = lib_item.get('Name', '')
-            lib_year = lib_item.get('ProductionYear')
-            
-            # Extremely strict matching to avoid false positives
-            if lib_name.lower() == title.lower() and lib_year == year:
-                matched_emby_id = lib_item.get('Id')
-                match_source = "Name and year exact match"
-                break
+        # Extremely strict matching to avoid false positives
+        matched_emby_id = library_index.get('name_year', _EMPTY_DICT).get((title.lower(), year))
+        if matched_emby_id:
+            match_source = "Name and year exact match"
     
     # If a match was found with any method
     if matched_emby_id:
-        log_info(f" Match found: {title} ({match_source})")
+        if _verbose_logging:
+            log_debug(f" Match found: {title} ({match_source})")
         # Store mapping for future using Trakt ID if available
         if trakt_id:
             item_type = "movie" if item.get("type") == "movie" else "show"
@@ -1430,16 +2057,51 @@ def process_item(item, access_token, library_id=None, collection_name=None):
     # If we get here, no match was found with any ID
     log_info(f" Could not find {item.get('type')}: {title} - No matching IDs in Emby library")
     # Add to missing items with minimal debug info
-    add_to_missing_items(media, item.get("type"), collection_name, library_id, "No matching IDs found in Emby library")
+    with _missing_items_lock:
+        add_to_missing_items(media, item.get("type"), collection_name, library_id, "No matching IDs found in Emby library")
     return None
 
+def get_library_for_run(item_type, library_id, library_cache=None):
+    """Return (items, index) for a library, pinned in library_cache (if given) for the rest of a sync run"""
+    key = (item_type, library_id)
+    if library_cache is not None and key in library_cache:
+        return library_cache[key]
+    items = get_emby_library_items(item_type, library_id)
+    entry = (items, _library_index.get(library_cache_key(item_type, library_id), _EMPTY_DICT))
+    # A failed fetch is not pinned, so the next list can try again
+    if library_cache is not None and items:
+        library_cache[key] = entry
+    return entry
+
+def process_items_batch(trakt_items, access_token, library_id, collection_name, on_result=None, library_cache=None):
+    """Match a whole Trakt list against Emby, resolving each library index once; returns the matched results"""
+    library_indexes = {}
+    for emby_item_type in {"Movie" if item.get("type") == "movie" else "Series" for item in trakt_items}:
+        library_indexes[emby_item_type] = get_library_for_run(emby_item_type, library_id, library_cache)[1]
+    
+    # Matching only reads the in-memory mappings and library index, so one pass in this thread
+    # is faster than handing every item to a worker pool
+    results = []
+    for item in trakt_items:
+        result, error = None, None
+        try:
+            result = process_item(item, access_token, library_id, collection_name, library_indexes)
+        except Exception as e:
+            error = e
+        if result:
+            results.append(result)
+        # Reports each finished item, e.g. for progress updates
+        if on_result:
+            on_result(result, error)
+    return results
+
 def log_provider_ids(lib_item, title=None):
     """Helper function to log all provider IDs for a library item for debugging"""
     if not _verbose_logging:
         return
     
     item_title = title or lib_item.get('Name', 'Unknown')
-    provider_ids = lib_item.get('ProviderIds', {})
+    provider_ids = lib_item.get('ProviderIds') or _EMPTY_DICT
     
     if not provider_ids:
         log_debug(f" {item_title} has no provider IDs")
@@ -1449,7 +2111,24 @@ def log_provider_ids(lib_item, title=None):
     for provider, id_value in provider_ids.items():
         log_debug(f"   {provider}: {id_value}")
 
-def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
+def group_lists_by_library(trakt_lists):
+    """Group Trakt lists by the Emby library (and type) they sync into, groups in the order they were configured"""
+    groups = OrderedDict()
+    for trakt_list in trakt_lists:
+        groups.setdefault((trakt_list.get("library_id"), trakt_list.get("type", "movies")), []).append(trakt_list)
+    return list(groups.values())
+
+# One lock per collection name (case-insensitive, as collections are looked up), so lists that
+# add to the same collection never create it concurrently
+_collection_locks = {}
+_collection_locks_lock = threading.Lock()
+
+def collection_lock(collection_name):
+    """Lock serializing the creation and update of one collection"""
+    with _collection_locks_lock:
+        return _collection_locks.setdefault((collection_name or '').lower(), threading.Lock())
+
+def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None, trakt_items=None, library_cache=None):
     # Check if environment is properly configured
     env_valid, missing_vars = check_required_env_vars()
     if not env_valid:
@@ -1478,11 +2157,10 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
         progress_callback(0.0, collection_name, 0, 0, start_msg)
     
     # Test Emby connection first
-    server_url = get_EMBY_SERVER().rstrip('/')
-    headers = {'X-Emby-Token': get_EMBY_API_KEY()}
+    server_url, headers = emby_connection()
     
     try:
-        test_response = requests.get(f"{server_url}/System/Info", headers=headers)
+        test_response = _emby_session.get(f"{server_url}/System/Info", headers=headers)
         if test_response.status_code != 200:
             error_msg = f" Cannot connect to Emby server: HTTP {test_response.status_code}"
             if test_response.status_code == 401:
@@ -1492,7 +2170,7 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
                 progress_callback(1.0, collection_name, 0, 0, error_msg)
             return
         else:
-            print(f" Connected to Emby server: {test_response.json().get('ServerName', 'Unknown')}")
+            print(f" Connected to Emby server: {response_json(test_response).get('ServerName', 'Unknown')}")
     except Exception as e:
         error_msg = f" Error connecting to Emby server: {str(e)}"
         print(error_msg)
@@ -1500,8 +2178,10 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
             progress_callback(1.0, collection_name, 0, 0, error_msg)
         return
     
-    # Get items from Trakt
-    trakt_items = get_trakt_list(trakt_list_id, access_token)
+    # Get items from Trakt, unless they were already fetched in bulk
+    if trakt_items is None:
+        with _trakt_api_semaphore:
+            trakt_items = get_trakt_list(trakt_list_id, access_token)
     if not trakt_items:
         msg = f" No items found in Trakt list: {collection_name}"
         print(msg)
@@ -1515,9 +2195,6 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
     if progress_callback:
         progress_callback(0.0, collection_name, 0, total_items, msg)
     
-    # Process items concurrently
-    emby_items = []
-    media_counts = {"movie": 0, "show": 0}
     processed_count = 0
     
     # Pre-fetch library data
@@ -1527,42 +2204,39 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
         progress_callback(0.0, collection_name, 0, total_items, msg)
     
     if list_type == "movies":
-        movies = get_emby_library_items("Movie", library_id)
+        movies = get_library_for_run("Movie", library_id, library_cache)[0]
         msg = f" Loaded {len(movies)} movies from Emby library"
         print(msg)
         if progress_callback:
             progress_callback(0.0, collection_name, 0, total_items, msg)
     else:
-        shows = get_emby_library_items("Series", library_id)
+        shows = get_library_for_run("Series", library_id, library_cache)[0]
         msg = f" Loaded {len(shows)} TV shows from Emby library"
         print(msg)
         if progress_callback:
             progress_callback(0.0, collection_name, 0, total_items, msg)
     
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        # Submit all tasks
-        future_to_item = {executor.submit(process_item, item, access_token, library_id, collection_name): item for item in trakt_items}
-        
-        # Process completed tasks
-        for future in as_completed(future_to_item):
-            try:
-                result = future.result()
-                if result:
-                    emby_items.append(result["id"])
-                    media_counts[result["type"]] += 1
-            except Exception as e:
-                error_msg = f" Error processing item: {str(e)}"
-                print(error_msg)
-                if progress_callback:
-                    progress_callback(processed_count / total_items, collection_name, 
-                                   processed_count, total_items, error_msg)
-            
-            # Update progress
-            processed_count += 1
+    def on_result(result, error):
+        nonlocal processed_count
+        if error:
+            error_msg = f" Error processing item: {str(error)}"
+            print(error_msg)
             if progress_callback:
-                progress = processed_count / total_items
-                msg = f" Processing items from {collection_name} ({processed_count}/{total_items})"
-                progress_callback(progress, collection_name, processed_count, total_items, msg)
+                progress_callback(processed_count / total_items, collection_name, 
+                               processed_count, total_items, error_msg)
+        
+        # Update progress
+        processed_count += 1
+        if progress_callback:
+            progress = processed_count / total_items
+            msg = f" Processing items from {collection_name} ({processed_count}/{total_items})"
+            progress_callback(progress, collection_name, processed_count, total_items, msg)
+    
+    # Missing items found while processing are saved once for the whole list, not per item
+    with suspend_saves():
+        results = process_items_batch(trakt_items, access_token, library_id, collection_name, on_result, library_cache)
+    emby_items = [result["id"] for result in results]
+    media_counts = Counter(result["type"] for result in results)
     
     if not emby_items:
         msg = f" No matching items found in Emby for {collection_name}"
@@ -1577,7 +2251,9 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
     if progress_callback:
         progress_callback(0.95, collection_name, processed_count, total_items, msg)
     
-    collection_id = create_emby_collection_with_movies(collection_name, emby_items)
+    # Two lists feeding the same collection must not both miss it and create it twice
+    with collection_lock(collection_name):
+        collection_id = create_emby_collection_with_movies(collection_name, emby_items)
     
     if collection_id:
         msg = f" Successfully created/updated collection '{collection_name}' (ID: {collection_id})"
@@ -1597,6 +2273,9 @@ def sync_trakt_list_to_emby(trakt_list, access_token, progress_callback=None):
         print(msg)
         if progress_callback:
             progress_callback(1.0, collection_name, processed_count, total_items, msg)
+    
+    # Write out the Emby ID mappings learned during this list
+    flush_emby_id_mappings(force=True)
 
 def sync_all_trakt_lists(progress_callback=None):
     # Check if environment is properly configured
@@ -1608,10 +2287,34 @@ def sync_all_trakt_lists(progress_callback=None):
             progress_callback(1.0, "Configuration Error", 0, 0, msg)
         return
 
+    global _collections_index_complete
     access_token = get_access_token()
     if access_token:
-        for trakt_list in get_trakt_lists():
-            sync_trakt_list_to_emby(trakt_list, access_token, progress_callback)
+        trakt_lists = get_trakt_lists()
+        # Fetch every list up front in parallel, then sync the lists one after another
+        list_ids = [trakt_list.get("list_id") for trakt_list in trakt_lists if trakt_list.get("list_id")]
+        libraries = {("Movie" if trakt_list.get("type", "movies") == "movies" else "Series", trakt_list["library_id"])
+                     for trakt_list in trakt_lists if trakt_list.get("library_id")}
+        # The Trakt lists, the Emby libraries they sync into and the collections index don't depend on
+        # each other, so all of them are fetched at once; the per-list syncs then find them cached.
+        # One collections fetch serves every lookup of the run (if it fails, lookups refetch on a miss).
+        # The libraries are pinned for the whole run so a long sync never refetches them mid-run
+        fetch_started = time.time()
+        library_cache = {}
+        with ThreadPoolExecutor(max_workers=2 + len(libraries)) as executor:
+            trakt_future = executor.submit(get_trakt_lists_bulk, list_ids, access_token)
+            executor.submit(get_all_collections_index, True)
+            for item_type, library_id in libraries:
+                executor.submit(get_library_for_run, item_type, library_id, library_cache)
+            trakt_items_by_list = trakt_future.result()
+        _collections_index_complete = _collections_index_time >= fetch_started
+        try:
+            # Lists syncing into the same library run back to back
+            for trakt_list in [trakt_list for group in group_lists_by_library(trakt_lists) for trakt_list in group]:
+                sync_trakt_list_to_emby(trakt_list, access_token, progress_callback,
+                                        trakt_items_by_list.get(trakt_list.get("list_id")), library_cache)
+        finally:
+            _collections_index_complete = False
     else:
         msg = "Failed to obtain access token. Please check Trakt configuration in Settings."
         print(msg)
@@ -1622,8 +2325,8 @@ def sync_all_trakt_lists(progress_callback=None):
 
 def get_access_token():
     """Get a valid access token, using saved token if available"""
-    # Reload environment variables
-    load_dotenv(override=True)
+    # Reload environment variables if .env changed
+    reload_env()
     
     # Try to load saved token
     token_data = load_token()
@@ -1646,6 +2349,34 @@ def get_access_token():
     
     return None
 
+# When the current fortnightly schedule was enabled; fortnights are counted from this date so they
+# don't depend on the parity of ISO week numbers, which flips at most year boundaries. Kept next to
+# the scripts and .env, so the web app and the console runner share it whatever directory they start in
+SCHEDULE_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedule_state.json')
+
+def get_fortnightly_epoch(sync_day, sync_time, create=False):
+    """Return the date the fortnightly schedule for this day and time was enabled, recording today if create"""
+    schedule_key = f"{sync_day} {sync_time}"
+    try:
+        state = load_json_file(SCHEDULE_STATE_FILE)
+        if state.get('fortnightly_schedule') == schedule_key:
+            return datetime.strptime(state['fortnightly_epoch'], '%Y-%m-%d').date()
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    if not create:
+        return None
+    epoch = datetime.now().date()
+    try:
+        dump_json_file({'fortnightly_schedule': schedule_key, 'fortnightly_epoch': epoch.isoformat()},
+                       SCHEDULE_STATE_FILE)
+    except OSError as e:
+        print(f"Error saving schedule state: {e}")
+    return epoch
+
+def is_fortnightly_week(day, epoch):
+    """Whether the weekly slot on this date is a fortnightly run: the first slot is 7-13 days after the epoch"""
+    return ((day - epoch).days // 7) % 2 == 1
+
 def get_next_occurrence_date(interval='6h', sync_time='00:00', sync_day='Monday', sync_date=1):
     """Calculate the next occurrence date based on schedule settings"""
     import calendar
@@ -1678,12 +2409,8 @@ def get_next_occurrence_date(interval='6h', sync_time='00:00', sync_day='Monday'
         # Parse the sync time
         hour, minute = map(int, sync_time.split(':'))
         
-        # Get the target day as an integer (0=Monday, 6=Sunday)
+        # Get the target day as an integer (0=Monday, 6=Sunday), as datetime.weekday() counts
         target_day = list(calendar.day_name).index(sync_day)
-        if target_day == 6:  # Adjust for calendar.day_name starting with Monday at index 0
-            target_day = 0
-        else:
-            target_day += 1
             
         # Calculate days until the next occurrence
         days_ahead = target_day - today.weekday()
@@ -1699,12 +2426,8 @@ def get_next_occurrence_date(interval='6h', sync_time='00:00', sync_day='Monday'
         # Similar to weekly, but we need to determine if it's the right week
         hour, minute = map(int, sync_time.split(':'))
         
-        # Get the target day as an integer (0=Monday, 6=Sunday)
+        # Get the target day as an integer (0=Monday, 6=Sunday), as datetime.weekday() counts
         target_day = list(calendar.day_name).index(sync_day)
-        if target_day == 6:  # Adjust for calendar.day_name starting with Monday at index 0
-            target_day = 0
-        else:
-            target_day += 1
             
         # Calculate days until the next occurrence this week
         days_ahead = target_day - today.weekday()
@@ -1714,12 +2437,10 @@ def get_next_occurrence_date(interval='6h', sync_time='00:00', sync_day='Monday'
         next_date = today + timedelta(days=days_ahead)
         next_date = next_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
         
-        # Determine if we're in an even or odd week
-        current_week = today.isocalendar()[1]
-        next_week = next_date.isocalendar()[1]
-        
-        # If next occurrence week has wrong parity, add another week
-        if (next_week % 2) != (current_week % 2):
+        # If that slot is in an off week, the run is the week after. Before the scheduler has
+        # recorded an epoch, it will use today
+        epoch = get_fortnightly_epoch(sync_day, sync_time) or today.date()
+        if not is_fortnightly_week(next_date.date(), epoch):
             next_date += timedelta(days=7)
             
         return next_date
@@ -1765,8 +2486,8 @@ def get_next_occurrence_date(interval='6h', sync_time='00:00', sync_day='Monday'
 
 def start_sync():
     """Start the sync process after checking configuration"""
-    # Reload environment variables
-    load_dotenv(override=True)
+    # Reload environment variables if .env changed
+    reload_env()
     
     env_valid, missing_vars = check_required_env_vars()
     if not env_valid:
@@ -1832,17 +2553,16 @@ def start_scheduler(interval='6h', sync_time='00:00'):
     elif interval == '2w':
         # For fortnightly, we use a week-based schedule but only run if it's the right week
         day_scheduler = day_methods.get(sync_day, schedule.every().monday)
+        # Kept across restarts, so the fortnight does not reset each time the scheduler starts
+        epoch = get_fortnightly_epoch(sync_day, sync_time, create=True)
         
         # Create a wrapper function that checks if it's the right week to run
         def fortnightly_sync():
-            # Get the current week number of the year
-            current_week = datetime.now().isocalendar()[1]
-            # Run only on even or odd weeks depending on when we start
-            if current_week % 2 == 0:
-                print(f" Running fortnightly sync (even week: {current_week})")
+            if is_fortnightly_week(datetime.now().date(), epoch):
+                print(f" Running fortnightly sync (fortnights counted from {epoch})")
                 return start_sync()
             else:
-                print(f" Skipping sync - not the right week (odd week: {current_week})")
+                print(f" Skipping sync - not the right week (fortnights counted from {epoch})")
                 return False
         
         day_scheduler.at(sync_time).do(fortnightly_sync)
@@ -1893,12 +2613,16 @@ def run_scheduler_forever():
         
         try:
             # Keep the script running to execute scheduled jobs
+            last_next_run = None
             while True:
                 schedule.run_pending()
                 next_run = schedule.next_run()
-                if next_run:
+                if next_run and next_run != last_next_run:
                     print(f" Next sync scheduled for: {next_run}")
-                time.sleep(60)  # Check every minute
+                    last_next_run = next_run
+                # Sleep until the next job is due rather than waking every minute
+                idle_seconds = schedule.idle_seconds()
+                time.sleep(max(1, idle_seconds) if idle_seconds is not None else 60)
         except KeyboardInterrupt:
             print("\n Scheduler stopped by user")
         except Exception as e:
@@ -1908,26 +2632,33 @@ def run_scheduler_forever():
 
 def clear_library_cache():
     """Clear the library cache"""
-    global _library_cache
+    global _library_cache, _collections_index_time
     _library_cache.clear()
+    _library_cache_times.clear()
+    _library_index.clear()
+    _collections_index_time = 0.0
+    for path in library_disk_cache_files():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
     print("Cleared Emby library cache")
 
+_IMDB_PATH_RE = re.compile(r'\[imdbid-(tt\d+)\]')
+
 def extract_imdb_from_path(path):
     """Extract IMDB ID from file path if present in [imdbid-ttXXXXXXX] format"""
+    # The substring check rejects the usual untagged path before the regex runs
     if not path or '[imdbid-' not in path:
         return None
-        
-    try:
-        # Find the pattern [imdbid-ttXXXXXXX]
-        match = re.search(r'\[imdbid-(tt\d+)\]', path)
-        if match:
-            imdb_id = match.group(1)
-            log_debug(f"Extracted IMDB ID from path: {imdb_id}")
-            return imdb_id
-    except Exception as e:
-        log_error(f"Error extracting IMDB ID from path: {e}")
-        
-    return None
+    
+    # Find the pattern [imdbid-ttXXXXXXX]
+    match = _IMDB_PATH_RE.search(path)
+    if not match:
+        return None
+    if _verbose_logging:
+        log_debug(f"Extracted IMDB ID from path: {match.group(1)}")
+    return match.group(1)
 
 def log_debug(message):
     """Print debug message only if verbose logging is enabled"""
@@ -1951,187 +2682,6 @@ def toggle_verbose_logging(enabled=None):
         _verbose_logging = not _verbose_logging
     return _verbose_logging
 
-def batch_match_by_provider_ids(items, library_items, item_type='movie'):
-    """Batch match items against library using provider IDs"""
-    # Create lookup dictionaries from library items for faster matching
-    imdb_lookup = {}
-    tmdb_lookup = {}
-    tvdb_lookup = {}
-    path_imdb_lookup = {}
-    
-    # Store matches
-    matches = {}
-    missing = []
-    
-    # Build lookup tables from library (do this only once for efficiency)
-    log_info(f"Building lookup tables from {len(library_items)} library items...")
-    for item in library_items:
-        item_id = item.get('Id')
-        # Get standard IMDB ID from metadata
-        provider_ids = item.get('ProviderIds', {})
-        emby_imdb_id = provider_ids.get('Imdb', '').strip()
-        if emby_imdb_id:
-            imdb_lookup[emby_imdb_id] = item_id
-            
-        # Get TMDB ID from metadata
-        emby_tmdb_id = provider_ids.get('Tmdb', '').strip()
-        if emby_tmdb_id:
-            tmdb_lookup[emby_tmdb_id] = item_id
-            
-        # Get TVDB ID from metadata
-        emby_tvdb_id = provider_ids.get('Tvdb', '').strip()
-        if emby_tvdb_id:
-            tvdb_lookup[emby_tvdb_id] = item_id
-        
-        # Check file path for IMDB ID
-        path = item.get('Path', '')
-        if path:
-            path_imdb_id = extract_imdb_from_path(path)
-            if path_imdb_id:
-                path_imdb_lookup[path_imdb_id] = item_id
-    
-    log_info(f"Created lookups: IMDB({len(imdb_lookup)}), TMDB({len(tmdb_lookup)}), TVDB({len(tvdb_lookup)}), Path IMDB({len(path_imdb_lookup)})")
-    
-    # Match each item
-    for item in items:
-        matched = False
-        title = item.get('title', '')
-        year = item.get('year')
-        ids = item.get('ids', {})
-        
-        # Try stored mapping first
-        trakt_id = ids.get('trakt')
-        if trakt_id:
-            emby_id = get_emby_id_from_mapping(item_type, trakt_id)
-            if emby_id:
-                log_debug(f"Found stored mapping for {title}: {emby_id}")
-                matches[title] = emby_id
-                matched = True
-                continue
-                
-        # Try IMDB ID
-        if not matched and 'imdb' in ids and ids['imdb']:
-            imdb_id = ids['imdb']
-            if imdb_id in imdb_lookup:
-                emby_id = imdb_lookup[imdb_id]
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                matched = True
-                continue
-                
-            # Try path IMDB lookup
-            if imdb_id in path_imdb_lookup:
-                emby_id = path_imdb_lookup[imdb_id]
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                matched = True
-                continue
-        
-        # Try TMDB ID
-        if not matched and 'tmdb' in ids and ids['tmdb']:
-            tmdb_id = str(ids['tmdb'])
-            if tmdb_id in tmdb_lookup:
-                emby_id = tmdb_lookup[tmdb_id]
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                matched = True
-                continue
-                
-        # Try TVDB ID
-        if not matched and 'tvdb' in ids and ids['tvdb'] and item_type == 'show':
-            tvdb_id = str(ids['tvdb'])
-            if tvdb_id in tvdb_lookup:
-                emby_id = tvdb_lookup[tvdb_id]
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                matched = True
-                continue
-                
-        # If we get here, no match was found for this item
-        if not matched:
-            missing.append({
-                'title': title,
-                'year': year,
-                'ids': ids,
-                'normalized_title': normalize_title(title)
-            })
-    
-    # Try fuzzy title matching for remaining items
-    if missing:
-        log_info(f"Trying fuzzy title matching for {len(missing)} remaining items...")
-        # Create normalized title lookup
-        title_lookup = {}
-        for item in library_items:
-            item_title = item.get('Name', '')
-            normalized = normalize_title(item_title)
-            # Skip empty titles
-            if not normalized:
-                continue
-            # Store with item ID
-            title_lookup[normalized] = item.get('Id')
-            
-        # Process missing items with fuzzy matching
-        for i, item in enumerate(missing[:]):
-            title = item['title']
-            normalized_title = item['normalized_title']
-            trakt_id = item['ids'].get('trakt')
-            
-            # Direct normalized match
-            if normalized_title in title_lookup:
-                emby_id = title_lookup[normalized_title]
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                missing.remove(item)
-                continue
-                
-            # Try word overlap for the rest
-            best_match = None
-            best_score = 0.6  # Minimum threshold
-            title_words = set(normalized_title.split())
-            
-            for lib_title, lib_id in title_lookup.items():
-                # Skip single-word titles to avoid false matches
-                if len(lib_title.split()) <= 1 or len(title_words) <= 1:
-                    continue
-                    
-                # Check if one title is contained within the other
-                if normalized_title in lib_title or lib_title in normalized_title:
-                    score = 0.9
-                    if not best_match or score > best_score:
-                        best_match = lib_id
-                        best_score = score
-                        
-                # Calculate word overlap
-                lib_words = set(lib_title.split())
-                common_words = title_words.intersection(lib_words)
-                if common_words:
-                    overlap = len(common_words) / max(len(title_words), len(lib_words))
-                    if overlap > best_score:
-                        best_match = lib_id
-                        best_score = overlap
-                        
-            # Use best match if found
-            if best_match:
-                emby_id = best_match
-                matches[title] = emby_id
-                # Store mapping for future
-                if trakt_id:
-                    add_emby_id_mapping(trakt_id, emby_id, item_type, title)
-                missing.remove(item)
-    
-    # Return results
-    return matches, missing
-
 if __name__ == "__main__":
     # Default to 6 hour schedule if not specified
     interval = os.getenv('SYNC_INTERVAL', '6h')